@@ -8,9 +8,12 @@ pip install selenium beautifulsoup4 gspread oauth2client pandas
 """
 
 import os
-import time
+import sys
 import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from urllib.parse import urlsplit
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -18,18 +21,112 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from bs4 import BeautifulSoup
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 import pandas as pd
 
+from http_fetch import HttpFetcher, needs_javascript
+from enrich import AsyncEnricher
+from session_store import SessionStore
+from rate_limit import RatePolicy, WaitTracker
+from waits import wait_for, scroll_until_stable
+from html_doc import Document
+from field_rules import JOBINJA_CARD_FIELDS
+from job_ids import normalize_url, jobinja_job_id
+from seen_index import SeenIndex
+from page_cache import PageCache
+from page_archive import PageArchive
+from output_sink import RecordSink
+from sheets_writer import SheetWriter
+from browser_profile import ResourcePolicy
+from metrics import RunMetrics, timed
+from profiling import JOBINJA_STAGES, RunProfiler, profile_arg
+
+# markers that only appear once a Jobinja page has actually rendered its content
+LISTING_MARKERS = ['c-jobListView__item', 'c-jobListView__list']
+DETAIL_MARKERS = ['c-jobView', 'c-infoBox', 's-jobDesc', 'o-box__text']
+
 class JobScraper:
-    def __init__(self, headless=False, chromedriver_path='chromedriver.exe'):
-        """Initialize the scraper with browser settings"""
+    def __init__(self, headless=False, chromedriver_path='chromedriver.exe', fetch_mode='browser',
+                 detail_concurrency=4, request_rate=1.0, request_burst=2, jitter=0.5,
+                 session_file='.sessions/jobinja.json', html_parser='auto',
+                 seen_db=None, refresh_days=30, cache_file=None, cache_ttl_hours=24,
+                 archive_file=None, sink=None, keep_jobs=True, max_pages=10, page_prefetch=3,
+                 lean_browser=True, resource_policy=None, metrics=None, base_url='https://jobinja.ir'):
+        """Initialize the scraper with browser settings
+
+        fetch_mode='http' fetches pages through a pooled requests.Session and only
+        starts Chrome when a page needs JavaScript (or for login). In that mode
+        detail pages are fetched concurrently, at most `detail_concurrency` at a
+        time. All requests to the site are paced to `request_rate` per second
+        (bursts of `request_burst`, plus up to `jitter` seconds of randomness).
+        After a successful login the session is saved to `session_file` and
+        reused on the next run. `html_parser` picks the BeautifulSoup backend
+        ('html.parser', 'lxml' or 'auto'). With `seen_db` (a SQLite file),
+        postings scraped less than `refresh_days` ago in earlier runs are skipped.
+        With `cache_file`, fetched pages are kept on disk for `cache_ttl_hours` and
+        re-runs within that time are served from the cache. With `archive_file`, every
+        downloaded page is also appended to a raw page archive (see page_archive.py).
+        fetch_mode='offline' starts neither Chrome nor HTTP - for re-parsing saved pages.
+        With a `sink` (output_sink.RecordSink) every record is written out as soon as
+        it is scraped and an interrupted run resumes from its checkpoint;
+        keep_jobs=False then stops collecting records in self.jobs.
+        Search results are followed up to `max_pages` pages per keyword (fetching
+        `page_prefetch` pages at once in http mode) and stop at the first page
+        without new postings. With lean_browser, Chrome skips images, fonts, media,
+        analytics and ads except on login pages (see browser_profile.py); pass a
+        `resource_policy` to change what is blocked. Phase timings and page/byte/
+        retry/error counters go to `metrics` (metrics.RunMetrics). `base_url` points
+        the scraper at another host with the same pages (e.g. fake_board.py).
+        """
+        self.base_url = base_url.rstrip('/')
         self.chromedriver_path = chromedriver_path
         self.headless = headless
-        self.setup_browser(headless)
+        self.fetch_mode = fetch_mode
+        self.max_pages = max_pages
+        self.page_prefetch = page_prefetch
+        self._browser_lock = threading.Lock()
+        self.html_parser = html_parser
+        self.metrics = metrics or RunMetrics(source='Jobinja')
+        self.waits = WaitTracker(metrics=self.metrics)
+        self.rate_policy = RatePolicy(rate=request_rate, burst=request_burst, jitter=jitter,
+                                      tracker=self.waits)
+        self.session_store = SessionStore(session_file) if session_file else None
+        self.fetcher = None
+        self.enricher = None
+        if fetch_mode == 'http':
+            self.fetcher = HttpFetcher(pool_size=max(10, detail_concurrency), metrics=self.metrics)
+            self.enricher = AsyncEnricher(self._fetch_details_http,
+                                          per_host_concurrency=detail_concurrency,
+                                          rate_policy=self.rate_policy)
+        self.resource_policy = resource_policy or (ResourcePolicy() if lean_browser else None)
+        self._driver = None
+        if fetch_mode not in ('http', 'offline'):
+            self.setup_browser(headless)
         self.jobs = []
+        self.job_count = 0
+        self.keep_jobs = keep_jobs
+        self.scraped_links = set()  # job IDs already scraped - checked before any detail fetch
+        self.resumed_links = set()  # the part of scraped_links written by an interrupted earlier run
+        self.sink = sink
+        if sink is not None:
+            # postings written by an interrupted earlier run
+            self.resumed_links = sink.done_ids('Jobinja')
+            self.scraped_links |= self.resumed_links
+        self.seen_index = SeenIndex(seen_db, refresh_days) if seen_db else None
+        self.page_cache = PageCache(cache_file, ttl_hours=cache_ttl_hours) if cache_file else None
+        self.archive = PageArchive(archive_file) if archive_file else None
+
+    @property
+    def driver(self):
+        """Chrome is started lazily in http mode, the first time a page needs it"""
+        if self._driver is None:
+            self.setup_browser(self.headless)
+        return self._driver
+
+    @driver.setter
+    def driver(self, value):
+        self._driver = value
 
     def setup_browser(self, headless):
         """Configure Chrome with anti-detection measures"""
@@ -47,9 +144,13 @@ class JobScraper:
         chrome_options.add_argument('--disable-dev-shm-usage')
         chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
         chrome_options.add_experimental_option('useAutomationExtension', False)
+        if self.resource_policy is not None:
+            self.resource_policy.configure(chrome_options)
 
         service = Service(executable_path=self.chromedriver_path)
         self.driver = webdriver.Chrome(service=service, options=chrome_options)
+        if self.resource_policy is not None:
+            self.resource_policy.attach(self.driver)
 
         # Remove webdriver property to help avoid simple bot-detection
         try:
@@ -70,12 +171,87 @@ class JobScraper:
 
     def human_delay(self, min_seconds=1.0, max_seconds=2.5):
         """Add random delay to mimic human behavior"""
-        time.sleep(random.uniform(min_seconds, max_seconds))
+        self.waits.sleep(random.uniform(min_seconds, max_seconds), 'human delay')
+
+    def fetch_page(self, url, markers=None, kind='detail'):
+        """Return the HTML of a page - from the page cache, over plain HTTP when possible, otherwise via Chrome"""
+        if self.page_cache is not None:
+            html = self.page_cache.get(url)
+            if html is not None:
+                return html
+        html = self._download_page(url, markers, kind)
+        if not needs_javascript(html, markers):
+            self._keep_page(url, html, kind)
+        return html
+
+    def _keep_page(self, url, html, kind):
+        """Store a freshly downloaded page in the page cache and the raw archive"""
+        if self.page_cache is not None:
+            self.page_cache.put(url, html)
+        if self.archive is not None:
+            self.archive.add(url, 'Jobinja', html, kind)
+
+    def navigate(self, url, page_type='detail'):
+        """Load a page in Chrome under the resource policy (blocking, timeout and traffic stats for page_type)"""
+        self.metrics.inc('pages')
+        if self.resource_policy is not None:
+            transferred, timed_out = self.resource_policy.navigate(self.driver, url, page_type)
+            self.metrics.inc('bytes', transferred)
+            if timed_out:
+                self.metrics.inc('errors')
+        else:
+            self.driver.get(url)
+
+    def _download_page(self, url, markers=None, kind='detail'):
+        self.rate_policy.pace(url)
+        if self.fetcher is not None:
+            with self.metrics.phase('navigation'):
+                html = self.fetcher.fetch(url)
+            if not needs_javascript(html, markers):
+                return html
+            print(f"   ↪️ Page needs a browser, falling back to Chrome: {url}")
+
+        # prefetch threads share the one Chrome - one navigation at a time
+        with self._browser_lock, self.metrics.phase('navigation'):
+            self.navigate(url, kind)
+            # wait for the content itself rather than a fixed delay
+            content_css = ', '.join('.' + m for m in markers) if markers else 'body'
+            wait_for(self.driver, EC.presence_of_element_located((By.CSS_SELECTOR, content_css)),
+                     timeout=10, tracker=self.waits, reason='page load')
+            return self.driver.page_source
+
+    def restore_session(self, login_url):
+        """Warm start: reuse the saved session if Jobinja still accepts it"""
+        if not self.session_store.restore(self.driver):
+            return False
+        # لاگین معتبر باشد، صفحه‌ی ورود redirect می‌کند و فیلد identifier ندارد
+        self.navigate(login_url, 'login')
+        login_path = urlsplit(login_url).path.rstrip('/')
+
+        def left_login(d):
+            return urlsplit(d.current_url).path.rstrip('/') != login_path
+
+        try:
+            WebDriverWait(self.driver, 8).until(lambda d: left_login(d) or d.find_elements(By.NAME, "identifier"))
+        except TimeoutException:
+            pass
+        # only a redirect away from the login page counts - a timeout or a page still loading is not a login
+        if self.driver.find_elements(By.NAME, "identifier") or not left_login(self.driver):
+            print("⚠️ Saved session was rejected - logging in again")
+            self.session_store.clear()
+            return False
+        print("✅ Restored saved session - skipping login.")
+        if self.fetcher is not None:
+            self.fetcher.load_cookies(self.driver.get_cookies())
+        return True
 
+    @timed('login')
     def auto_login(self, email: str, password: str, site='jobinja'):
         try:
-            login_url = "https://jobinja.ir/login/user"
-            self.driver.get(login_url)
+            login_url = f"{self.base_url}/login/user"
+            if self.session_store is not None and self.restore_session(login_url):
+                return True
+            self.navigate(login_url, 'login')
 
             # صبر برای لود فیلدها
             email_elem = WebDriverWait(self.driver, 15).until(
@@ -102,7 +278,13 @@ class JobScraper:
             )
 
             print("✅ Login successful.")
-            self.human_delay(1, 2)
+            wait_for(self.driver, lambda d: d.execute_script("return document.readyState") == 'complete',
+                     timeout=10, tracker=self.waits, reason='login')
+            if self.session_store is not None:
+                self.session_store.save(self.driver)
+            if self.fetcher is not None:
+                # share the logged-in session with the HTTP fetcher
+                self.fetcher.load_cookies(self.driver.get_cookies())
             return True
 
         except Exception as e:
@@ -110,37 +292,169 @@ class JobScraper:
             return False
 
     # ----- (بقیه توابع اسکرپینگ شما) -----
-    def scrape_jobinja(self, keywords=['machine learning', 'هوش مصنوعی']):
+    def scrape_jobinja(self, keywords=['machine learning', 'هوش مصنوعی'], keyword_concurrency=1,
+                       max_jobs=None, max_jobs_per_keyword=None):
+        """Scrape every keyword's result pages
+
+        With keyword_concurrency > 1 or a budget (max_jobs for the run,
+        max_jobs_per_keyword per keyword) the keywords are searched as
+        concurrent tasks feeding one de-duplicated detail pool (scheduler.py).
+        """
         print("🔍 Scraping Jobinja...")
+        if keyword_concurrency > 1 or max_jobs is not None or max_jobs_per_keyword is not None:
+            return self._scrape_scheduled(keywords, keyword_concurrency, max_jobs, max_jobs_per_keyword)
         for keyword in keywords:
+            if self.sink is not None and self.sink.keyword_done('Jobinja', keyword):
+                print(f"\n   ♻️ '{keyword}' was finished before the restart - skipping")
+                continue
             try:
-                search_url = f"https://jobinja.ir/jobs?filters[keywords][]={keyword.replace(' ', '+')}"
                 print(f"\n   Searching for: {keyword}")
-                self.driver.get(search_url)
-                self.human_delay(3, 5)
-
-                soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-                job_cards = soup.find_all('li', class_='c-jobListView__item')
-
-                print(f"   Found {len(job_cards)} job listings")
-
-                for card in job_cards:
-                    try:
-                        job_data = self.parse_jobinja_card(card)
-                        if job_data and not any(job['link'] == job_data['link'] for job in self.jobs):
-                            self.jobs.append(job_data)
-                            print(f"   ✅ {job_data['title']} - {job_data['company']}")
-                    except Exception as e:
-                        print(f"   ⚠️ Error parsing job card: {e}")
-                        continue
-
-                self.human_delay(2, 4)
+                with self.metrics.labels(keyword=keyword):
+                    for page, job_cards in self.listing_pages(keyword):
+                        print(f"   Page {page}: found {len(job_cards)} job listings")
+                        if not job_cards:
+                            break
+                        if not self.process_cards(job_cards):
+                            # everything on this page is known from earlier runs - later pages are older still
+                            print(f"   ⏹️ Only postings from earlier runs on page {page} - stopping")
+                            break
+                if self.sink is not None:
+                    self.sink.finish_keyword('Jobinja', keyword)
 
             except Exception as e:
                 print(f"   ❌ Error scraping Jobinja for '{keyword}': {e}")
+                self.metrics.inc('errors')
+                continue
+
+        self.waits.report()
+        self.metrics.report()
+        if self.page_cache is not None:
+            self.page_cache.report()
+        if self.resource_policy is not None:
+            self.resource_policy.report()
+
+    def _scrape_scheduled(self, keywords, keyword_concurrency, max_jobs, max_jobs_per_keyword):
+        from scheduler import Scheduler
+        from sources import JobinjaSource
+
+        # already logged in - the scheduler only borrows this scraper's limiter and sink
+        scheduler = Scheduler([JobinjaSource(self)], sink=self.sink, rate_policy=self.rate_policy, waits=self.waits,
+                              metrics=self.metrics,
+                              keyword_concurrency=keyword_concurrency, max_jobs=max_jobs,
+                              max_jobs_per_keyword=max_jobs_per_keyword)
+        try:
+            scheduler.run(keywords, start=False)
+        finally:
+            scheduler.pool.shutdown(wait=True)
+
+    def listing_pages(self, keyword):
+        """Yield (page number, job cards) for a keyword's result pages, up to max_pages deep
+
+        In http mode the next `page_prefetch` pages are fetched concurrently while
+        the current one is processed; pages not consumed when the caller stops
+        are cancelled.
+        """
+        search_url = f"{self.base_url}/jobs?filters[keywords][]={keyword.replace(' ', '+')}"
+
+        def load(page):
+            url = search_url if page == 1 else f"{search_url}&page={page}"
+            html = self.fetch_page(url, markers=LISTING_MARKERS, kind='listing')
+            return Document(html, self.html_parser, self.metrics).soup.find_all('li', class_='c-jobListView__item')
+
+        # a single Chrome can only load one page at a time
+        ahead = max(1, self.page_prefetch) if self.fetcher is not None else 1
+        futures = {}
+        with ThreadPoolExecutor(max_workers=ahead) as pool:
+            try:
+                next_page = 1
+                for page in range(1, self.max_pages + 1):
+                    while next_page <= min(page + ahead - 1, self.max_pages):
+                        futures[next_page] = pool.submit(self.metrics.bind(load), next_page)
+                        next_page += 1
+                    yield page, futures.pop(page).result()
+            finally:
+                for future in futures.values():
+                    future.cancel()
+
+    def process_cards(self, job_cards):
+        """Parse a page of listing cards into records
+
+        Returns how many of its postings earlier runs had not already covered
+        (new ones plus those scraped under another keyword this run); 0 means
+        the rest of the results are older still and paging can stop.
+        """
+        # with an enricher, cards are parsed first and detail pages fetched together afterwards
+        concurrent = self.enricher is not None
+        pending = []
+        new = 0
+        duplicates = 0
+        known = 0
+        for card in job_cards:
+            try:
+                # the same posting shows up under several keywords - skip it before paying for its details
+                job_id = jobinja_job_id(self.card_link(card))
+                if job_id and job_id in self.resumed_links:
+                    # written by the interrupted run this one resumes
+                    known += 1
+                    continue
+                if job_id and job_id in self.scraped_links:
+                    # already scraped under another keyword this run - no reason to stop paging
+                    duplicates += 1
+                    continue
+                if job_id and self.seen_index and not self.seen_index.needs_fetch('Jobinja', job_id):
+                    # scraped recently in an earlier run
+                    known += 1
+                    continue
+                new += 1
+                job_data = self.parse_jobinja_card(card, fetch_details=not concurrent)
+                if not job_data:
+                    continue
+                self.scraped_links.add(job_id)
+                if concurrent:
+                    pending.append(job_data)
+                    continue
+                self._add_job(job_id, job_data)
+                print(f"   ✅ {job_data['title']} - {job_data['company']}")
+            except Exception as e:
+                print(f"   ⚠️ Error parsing job card: {e}")
+                self.metrics.inc('errors')
                 continue
 
-    def parse_jobinja_card(self, card):
+        if pending:
+            self.enrich_jobs(pending)
+            for job_data in pending:
+                self._add_job(jobinja_job_id(job_data['link']), job_data)
+                print(f"   ✅ {job_data['title']} - {job_data['company']}")
+        if duplicates:
+            print(f"   ↩️ Skipped {duplicates} postings already scraped")
+        if known:
+            print(f"   ↩️ Skipped {known} postings known from earlier runs")
+        return new + duplicates
+
+    @timed('save')
+    def _add_job(self, job_id, job_data):
+        """Record a scraped posting: self.jobs, the streaming sink and the seen index"""
+        self.job_count += 1
+        if self.keep_jobs:
+            self.jobs.append(job_data)
+        if self.sink is not None:
+            self.sink.write('Jobinja', job_id, job_data)
+        if self.seen_index is not None and job_id:
+            self.seen_index.mark('Jobinja', job_id, job_data['link'])
+
+    def card_link(self, card):
+        """Absolute job link of a listing card, without tracking parameters ('' if none)"""
+        title_elem = card.find('h2', class_='o-listView__itemTitle')
+        title_link = title_elem.find('a') if title_elem else None
+        if not title_link:
+            return ''
+        job_link = title_link.get('href', '')
+        if job_link and job_link.startswith('/'):
+            job_link = self.base_url + job_link
+        return normalize_url(job_link)
+
+    @timed('extract')
+    def parse_jobinja_card(self, card, fetch_details=True):
         """Parse individual job card from Jobinja - FIXED VERSION"""
         try:
             title_elem = card.find('h2', class_='o-listView__itemTitle')
@@ -152,9 +466,7 @@ class JobScraper:
                 return None
 
             title = title_link.get_text(strip=True)
-            job_link = title_link.get('href', '')
-            if job_link and job_link.startswith('/'):
-                job_link = "https://jobinja.ir" + job_link
+            job_link = self.card_link(card)
 
             import re
             title = re.sub(r'\([^)]*روز[^)]*\)|\(امروز\)|\(دیروز\)', '', title).strip()
@@ -162,23 +474,17 @@ class JobScraper:
             company_elem = card.find('div', class_='c-jobListView__company')
             company = company_elem.get_text(strip=True) if company_elem else 'N/A'
 
-            location = 'N/A'
-            contract_type = 'N/A'
+            # each meta item is either a contract type or a location (rules in field_rules.py)
+            meta = {'location': 'N/A', 'contract_type': 'N/A'}
             meta_items = card.find_all('li', class_='c-jobListView__metaItem')
             for item in meta_items:
-                text = item.get_text(strip=True)
-                if 'تمام‌وقت' in text or 'تمام وقت' in text:
-                    contract_type = 'تمام‌وقت'
-                elif 'پاره‌وقت' in text or 'پاره وقت' in text:
-                    contract_type = 'پاره‌وقت'
-                elif 'دورکاری' in text:
-                    contract_type = 'دورکاری'
-                elif 'پروژه‌ای' in text:
-                    contract_type = 'پروژه‌ای'
-                elif 'تهران' in text or '،' in text:
-                    location = text
-
-            details = self.get_job_details(job_link)
+                field, value = JOBINJA_CARD_FIELDS.classify(item.get_text(strip=True))
+                if field:
+                    meta[field] = value
+            location = meta['location']
+            contract_type = meta['contract_type']
+
+            details = self.get_job_details(job_link) if fetch_details else {}
 
             return {
                 'date_added': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
@@ -209,15 +515,51 @@ class JobScraper:
             if not job_url:
                 return details
 
-            self.driver.get(job_url)
-            self.human_delay(2, 3)
+            html = self.fetch_page(job_url, markers=DETAIL_MARKERS)
+            details.update(self.extract_job_details(Document(html, self.html_parser, self.metrics).soup))
 
-            WebDriverWait(self.driver, 7).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
+        except Exception as e:
+            print(f"   Could not fetch details from {job_url}: {e}")
+            self.metrics.inc('errors')
 
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
+        return details
+
+    def _fetch_details_http(self, job_url):
+        """Enricher worker: HTTP fetch + extract, None when the page needs a browser"""
+        html = self.fetcher.fetch(job_url)
+        if needs_javascript(html, DETAIL_MARKERS):
+            return None
+        self._keep_page(job_url, html, 'detail')
+        return self.extract_job_details(Document(html, self.html_parser, self.metrics).soup)
+
+    def enrich_jobs(self, jobs):
+        """Fetch the detail pages of already-parsed cards concurrently and merge them in"""
+        cached = {}
+        if self.page_cache is not None:
+            for job in jobs:
+                html = self.page_cache.get(job['link']) if job['link'] else None
+                if html is not None:
+                    cached[job['link']] = self.extract_job_details(Document(html, self.html_parser, self.metrics).soup)
+        results, stats = self.enricher.run([job['link'] for job in jobs if job['link'] not in cached])
+        results.update(cached)
+        print(f"   ⚡ {stats}" + (f" (+{len(cached)} from cache)" if cached else ""))
+        for job in jobs:
+            details = results.get(job['link'])
+            if details is None and job['link']:
+                # fetch failed or the page needs JavaScript - take the one-at-a-time path
+                details = self.get_job_details(job['link'])
+            job.update(details or {})
+
+    @timed('extract')
+    def extract_job_details(self, soup):
+        """Pull salary, working hours and requirements out of a parsed job page"""
+        details = {
+            'requirements': 'N/A',
+            'salary': 'توافقی',
+            'working_hours': 'استاندارد'
+        }
 
+        try:
             # Extract salary (سعی می‌کنیم چند گزینه معمول را بررسی کنیم)
             salary_section = None
             # common info boxes
@@ -258,63 +600,40 @@ class JobScraper:
                 details['requirements'] = desc_text[:3000]
 
         except Exception as e:
-            print(f"   Could not fetch details from {job_url}: {e}")
+            print(f"   Could not extract job details: {e}")
 
         return details
 
+    @timed('scroll')
     def scroll_page(self):
-        """Scroll page to load more content"""
-        last_height = self.driver.execute_script("return document.body.scrollHeight")
-        for _ in range(3):  # Scroll 3 times
-            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            self.human_delay(1, 2)
-            new_height = self.driver.execute_script("return document.body.scrollHeight")
-            if new_height == last_height:
-                break
-            last_height = new_height
-
-    def save_to_google_sheets(self, spreadsheet_name='AI_ML_Jobs', credentials_file='credentials.json'):
-        """Save scraped jobs to Google Sheets"""
+        """Scroll page to load more content, until no new job cards appear"""
+        return scroll_until_stable(self.driver, 'li.c-jobListView__item', max_scrolls=3,
+                                   tracker=self.waits)
+
+    @timed('save')
+    def save_to_google_sheets(self, spreadsheet_name='AI_ML_Jobs', credentials_file='credentials.json', client=None):
+        """Save scraped jobs to Google Sheets (batched appends; `client` may be a fake_gspread.FakeClient)"""
         print("\n📊 Saving to Google Sheets...")
         try:
-            scope = ['https://spreadsheets.google.com/feeds',
-                     'https://www.googleapis.com/auth/drive']
-            creds = ServiceAccountCredentials.from_json_keyfile_name(credentials_file, scope)
-            client = gspread.authorize(creds)
+            if client is None:
+                scope = ['https://spreadsheets.google.com/feeds',
+                         'https://www.googleapis.com/auth/drive']
+                creds = ServiceAccountCredentials.from_json_keyfile_name(credentials_file, scope)
+                client = gspread.authorize(creds)
 
             try:
                 sheet = client.open(spreadsheet_name).sheet1
-            except:
+                writer = SheetWriter(sheet, sleep=lambda s: self.waits.sleep(s, 'sheets quota'))
+            except gspread.exceptions.SpreadsheetNotFound:
                 spreadsheet = client.create(spreadsheet_name)
                 sheet = spreadsheet.sheet1
-                headers = ['Date Added', 'Job Title', 'Company', 'Location', 'Requirements',
-                           'Salary', 'Contract Type', 'Working Hours', 'Job Link', 'Source']
-                sheet.append_row(headers)
+                writer = SheetWriter(sheet, sleep=lambda s: self.waits.sleep(s, 'sheets quota'))
+                writer.write_header()
 
-            try:
-                existing_links = set(sheet.col_values(9)[1:])  # Column 9 is Job Link
-            except:
-                existing_links = set()
-
-            new_jobs = [job for job in self.jobs if job['link'] not in existing_links]
-
-            for job in new_jobs:
-                row = [
-                    job['date_added'],
-                    job['title'],
-                    job['company'],
-                    job.get('location', 'N/A'),
-                    job['requirements'],
-                    job['salary'],
-                    job['contract_type'],
-                    job['working_hours'],
-                    job['link'],
-                    job['source']
-                ]
-                sheet.append_row(row)
-
-            print(f"✅ Added {len(new_jobs)} new jobs to Google Sheets")
-            print(f"   (Skipped {len(self.jobs) - len(new_jobs)} duplicates)")
+            added, duplicates = writer.append_jobs(self.jobs)
+
+            print(f"✅ Added {added} new jobs to Google Sheets")
+            print(f"   (Skipped {duplicates} duplicates, {writer.calls} API calls)")
 
         except FileNotFoundError:
             print("❌ credentials.json not found! Falling back to CSV.")
@@ -324,12 +643,16 @@ class JobScraper:
             print("   Falling back to CSV...")
             self.save_to_csv()
 
+    @timed('save')
     def save_to_csv(self, filename='jobs.csv'):
-        """Fallback: Save to CSV file"""
+        """Fallback: Save to CSV file (appends in incremental mode, where a run only holds new postings)"""
         print(f"\n💾 Saving to {filename}...")
         if self.jobs:
             df = pd.DataFrame(self.jobs)
-            df.to_csv(filename, index=False, encoding='utf-8-sig')
+            if self.seen_index is not None and os.path.exists(filename):
+                df.to_csv(filename, mode='a', header=False, index=False, encoding='utf-8')
+            else:
+                df.to_csv(filename, index=False, encoding='utf-8-sig')
             print(f"✅ Saved {len(self.jobs)} jobs to {filename}")
         else:
             print("⚠️ No jobs to save")
@@ -337,9 +660,20 @@ class JobScraper:
     def close(self):
         """Close the browser"""
         try:
-            self.driver.quit()
+            if self._driver is not None:
+                self._driver.quit()
         except Exception:
             pass
+        if self.fetcher is not None:
+            self.fetcher.close()
+        if self.seen_index is not None:
+            self.seen_index.close()
+        if self.page_cache is not None:
+            self.page_cache.close()
+        if self.archive is not None:
+            self.archive.close()
+        if self.sink is not None:
+            self.sink.close()
 
 def main():
     print("🚀 Starting Iranian Job Market Scraper (Auto-login)\n")
@@ -351,7 +685,27 @@ def main():
     # import getpass
     # PASSWORD = os.environ.get("JOBVISION_PASSWORD") or getpass.getpass("Password for JobVision: ").strip()
 
-    scraper = JobScraper(headless=False, chromedriver_path='chromedriver.exe')
+    # --profile[=prefix] -> sampled flame-graph stacks + per-stage CPU/wall table (profiling.py);
+    # started after the prompts so the time spent typing is not profiled
+    prefix = profile_arg(sys.argv, 'profile_jobinja')
+    profiler = RunProfiler(prefix).instrument(JobScraper, JOBINJA_STAGES).start() if prefix else None
+
+    # JOBINJA_FETCH_MODE=http -> plain HTTP fetches, Chrome only when a page needs JavaScript
+    fetch_mode = os.environ.get("JOBINJA_FETCH_MODE", "browser")
+    # SEEN_JOBS_DB=seen_jobs.sqlite -> incremental runs: postings scraped recently are skipped
+    scraper = JobScraper(headless=False, chromedriver_path='chromedriver.exe', fetch_mode=fetch_mode,
+                         seen_db=os.environ.get("SEEN_JOBS_DB"),
+                         # PAGE_CACHE=.cache/pages.sqlite -> re-runs within a day reuse fetched pages
+                         cache_file=os.environ.get("PAGE_CACHE"),
+                         # PAGE_ARCHIVE=archive/pages.jsonl.gz -> keep raw pages for `python page_archive.py reparse`
+                         archive_file=os.environ.get("PAGE_ARCHIVE"),
+                         # STREAM_OUTPUT=jobinja_stream -> records appended to jobinja_stream.csv/.jsonl as
+                         # they are scraped; a crashed run resumes from jobinja_stream.checkpoint.json
+                         sink=RecordSink.at(os.environ["STREAM_OUTPUT"]) if os.environ.get("STREAM_OUTPUT") else None,
+                         # BROWSER_PROFILE=full -> Chrome loads images/fonts/analytics too
+                         lean_browser=os.environ.get("BROWSER_PROFILE", "lean") != "full",
+                         # JOBINJA_BASE_URL=http://127.0.0.1:8800 -> scrape the local stand-in board (fake_board.py)
+                         base_url=os.environ.get("JOBINJA_BASE_URL", "https://jobinja.ir"))
 
     try:
         # ابتدا تلاش برای لاگین خودکار (به Jobinja یا jobvision)
@@ -361,11 +715,19 @@ def main():
             print("⚠️ Auto-login failed. Continuing anyway (maybe public pages قابل دسترسی هستند).")
 
         # اجرای اسکرپ Jobinja
-        scraper.scrape_jobinja(keywords=[
+        keywords = [
             'machine learning',
             'هوش مصنوعی',
             'deep learning'
-        ])
+        ]
+        # JOBINJA_KEYWORD_CONCURRENCY=4 -> keywords searched side by side (useful with JOBINJA_FETCH_MODE=http);
+        # MAX_JOBS=200 caps the postings fetched over all keywords
+        scraper.scrape_jobinja(keywords=keywords,
+                               keyword_concurrency=int(os.environ.get("JOBINJA_KEYWORD_CONCURRENCY", "1")),
+                               max_jobs=int(os.environ["MAX_JOBS"]) if os.environ.get("MAX_JOBS") else None)
+        if scraper.sink is not None and scraper.sink.all_done('Jobinja', keywords):
+            # همه‌ی کلمات کلیدی تمام شد - اجرای بعدی از اول شروع می‌کند
+            scraper.sink.finish()
 
         # ذخیره نتایج
         if scraper.jobs:
@@ -380,7 +742,16 @@ def main():
         traceback.print_exc()
 
     finally:
+        # Chrome is closed first - a metrics write that fails must not leave it running
         scraper.close()
+        if os.environ.get("METRICS_OUTPUT"):
+            # METRICS_OUTPUT=run_metrics -> run_metrics.prom (Prometheus text) + run_metrics.json (run report)
+            try:
+                print(f"📈 Metrics written to {', '.join(scraper.metrics.write(os.environ['METRICS_OUTPUT']))}")
+            except OSError as e:
+                print(f"⚠️ Could not write metrics: {e}")
+        if profiler is not None:
+            profiler.stop()
         print("\n🏁 Scraping complete!")
 
 if __name__ == "__main__":
@@ -1,5 +1,8 @@
 # jobvision_scraper_fixed.py
 import os
+import sys
+import queue
+import threading
 import time
 import random
 import re
@@ -9,7 +12,6 @@ from datetime import datetime
 
 import cv2
 import numpy as np
-from bs4 import BeautifulSoup
 import pandas as pd
 
 from selenium import webdriver
@@ -22,6 +24,78 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 
+from http_fetch import HttpFetcher, needs_javascript
+from rate_limit import RatePolicy, WaitTracker
+from waits import wait_for, scroll_until_stable
+from html_doc import Document
+from field_rules import JOBVISION_FIELDS
+from job_ids import jobvision_job_id
+from seen_index import SeenIndex
+from page_cache import PageCache
+from page_archive import PageArchive
+from output_sink import RecordSink
+from browser_profile import ResourcePolicy
+from metrics import RunMetrics, timed
+from profiling import JOBVISION_STAGES, RunProfiler, profile_arg
+from excel_export import write_excel, read_jsonl, COLUMN_LAYOUT
+from session_store import SessionStore
+
+# چیزهایی که فقط در صفحه‌ی رندر شده‌ی آگهی وجود دارند
+DETAIL_MARKERS = ['/companies/', '<h1']
+# (absolute) href of every element matching arguments[0], in document order
+JOB_HREFS_SCRIPT = """
+return Array.prototype.map.call(document.querySelectorAll(arguments[0]), function (a) { return a.href; });
+"""
+TITLE_SELECTORS = ["h1", ".job-card-title", ".job-title", "h2", "div.job-title"]
+SECTION_HEADERS = ['h2', 'h3', 'h4', 'h5', 'strong']
+SECTION_SIBLINGS = 12
+# همه‌ی چیزی که از صفحه‌ی آگهی لازم است در یک round trip:
+# متن اولین match هر title selector، متن لینک شرکت، هدرها با متن sibling‌هایشان و خود HTML
+DETAIL_SCRIPT = """
+var titleSelectors = arguments[0], headerSelector = arguments[1], maxSiblings = arguments[2];
+function stripped(el) {  // like BeautifulSoup's get_text(strip=True)
+    var walker = document.createTreeWalker(el, NodeFilter.SHOW_TEXT), node, out = [];
+    while ((node = walker.nextNode())) { var t = node.nodeValue.trim(); if (t) out.push(t); }
+    return out.join('');
+}
+var titles = titleSelectors.map(function (sel) {
+    var el = document.querySelector(sel);
+    return el ? el.innerText.trim() : null;
+});
+var companyLink = document.querySelector("a[href*='/companies/']");
+var sections = Array.prototype.map.call(document.querySelectorAll(headerSelector), function (h) {
+    var texts = [], el = h.nextElementSibling;
+    while (el && texts.length < maxSiblings && !/^H[2-5]$/.test(el.tagName)) {
+        texts.push(stripped(el));
+        el = el.nextElementSibling;
+    }
+    return [stripped(h), texts];
+});
+return {titles: titles, company: companyLink ? companyLink.innerText.trim() : null,
+        sections: sections, html: document.documentElement.outerHTML};
+"""
+
+
+def sibling_texts(header, limit=SECTION_SIBLINGS):
+    """Stripped texts of the elements after a header, up to the next h2-h5 (BeautifulSoup side of DETAIL_SCRIPT)"""
+    texts = []
+    elem = header.find_next_sibling()
+    while elem and len(texts) < limit and elem.name not in ['h2', 'h3', 'h4', 'h5']:
+        texts.append(elem.get_text(strip=True))
+        elem = elem.find_next_sibling()
+    return texts
+
+
+def section_items(sections, match, limit):
+    """Texts longer than 10 chars among the first `limit` siblings of the first header that matches"""
+    for header_text, siblings in sections:
+        if match(header_text):
+            if not isinstance(siblings, list):
+                siblings = sibling_texts(siblings)
+            return [text for text in siblings[:limit] if text and len(text) > 10]
+    return []
+
+
 # -----------------------------
 # تنظیمات و کلاس اصلی
 # -----------------------------
@@ -33,19 +107,87 @@ class JobVisionScraper:
                  chromedriver_path: str = 'chromedriver.exe',
                  max_login_attempts: int = 5,
                  captcha_attempts_per_cycle: int = 3,
-                 refresh_cycles: int = 3):
+                 refresh_cycles: int = 3,
+                 fetch_mode: str = 'browser',
+                 pool_size: int = 1,
+                 worker_memory_mb: int = None,
+                 request_rate: float = 0.5,
+                 jitter: float = 0.5,
+                 session_file: str = '.sessions/jobvision.json',
+                 html_parser: str = 'auto',
+                 seen_db: str = None,
+                 refresh_days: int = 30,
+                 cache_file: str = None,
+                 cache_ttl_hours: int = 24,
+                 archive_file: str = None,
+                 sink: RecordSink = None,
+                 keep_jobs: bool = True,
+                 lean_browser: bool = True,
+                 resource_policy: ResourcePolicy = None,
+                 metrics: RunMetrics = None,
+                 base_url: str = 'https://jobvision.ir',
+                 account_url: str = 'https://account.jobvision.ir'):
+        # fetch_mode='http': بعد از لاگین، صفحات آگهی با یک requests.Session
+        # که کوکی‌های مرورگر را دارد گرفته می‌شوند و مرورگر فقط برای fallback است
+        # pool_size > 1: صفحات آگهی با چند Chrome موازی (با همان لاگین) گرفته می‌شوند؛
+        # worker_memory_mb سقف heap جاوااسکریپت هر Chrome است
+        # request_rate: سقف درخواست به سایت در ثانیه (برای همه‌ی workerها با هم) + تا jitter ثانیه تاخیر تصادفی
+        # session_file: کوکی‌ها/localStorage بعد از لاگین ذخیره می‌شوند تا اجرای بعدی لاگین نکند (None = غیرفعال)
+        # html_parser: backend برای BeautifulSoup ('html.parser', 'lxml' یا 'auto')
+        # seen_db: فایل SQLite آگهی‌های دیده‌شده؛ آگهی‌هایی که کمتر از refresh_days روز پیش گرفته شده‌اند رد می‌شوند
+        # cache_file: صفحات گرفته‌شده تا cache_ttl_hours ساعت روی دیسک می‌مانند و اجرای دوباره از cache می‌خواند
+        # archive_file: HTML خام همه‌ی صفحات دانلودشده برای parse دوباره (page_archive.py)
+        # fetch_mode='offline': بدون مرورگر و HTTP - فقط برای parse صفحات ذخیره‌شده
+        # sink: هر رکورد بلافاصله در CSV/JSONL نوشته می‌شود و اجرای قطع‌شده از checkpoint ادامه می‌دهد؛
+        # keep_jobs=False یعنی رکوردها در self.jobs نگه داشته نمی‌شوند (حافظه ثابت)
+        # lean_browser: تصاویر، فونت‌ها، آنالیتیکس و تبلیغات جز در صفحه‌ی لاگین/کپچا بارگذاری نمی‌شوند
+        # (browser_profile.py)؛ resource_policy برای تنظیم دلخواه
+        # metrics: زمان هر مرحله (login، captcha، navigation، ...) و شمارنده‌ی صفحات/بایت/تلاش مجدد/خطا (metrics.py)
+        # base_url / account_url: سایت اصلی و سایت لاگین - برای اجرا روی سرور محلی (fake_board.py)
         self.email = email
+        self.base_url = base_url.rstrip('/')
+        self.account_url = account_url.rstrip('/')
+        # آدرس سایت لاگین بدون scheme - تا وقتی current_url شامل آن است هنوز وارد نشده‌ایم
+        self.account_site = self.account_url.split('://', 1)[-1]
         self.password = password
         self.jobs = []
+        self.job_count = 0
+        self.keep_jobs = keep_jobs
         self.scraped_links = set()
+        self.resumed_links = set()
+        self.sink = sink
+        if sink is not None:
+            # آگهی‌هایی که اجرای قطع‌شده‌ی قبلی نوشته است
+            self.resumed_links = sink.done_ids('JobVision')
+            self.scraped_links |= self.resumed_links
         self.chromedriver_path = chromedriver_path
         self.max_login_attempts = max_login_attempts
         self.captcha_attempts = captcha_attempts_per_cycle
         self.refresh_cycles = refresh_cycles
-        self.setup_browser(headless)
-
-    def setup_browser(self, headless=False):
+        self.fetch_mode = fetch_mode
+        self.fetcher = None
+        self.headless = headless
+        self.pool_size = pool_size
+        self.worker_memory_mb = worker_memory_mb
+        self.metrics = metrics or RunMetrics(source='JobVision')
+        self.waits = WaitTracker(metrics=self.metrics)
+        self.rate_policy = RatePolicy(rate=request_rate, burst=1, jitter=jitter, tracker=self.waits)
+        self.session_store = SessionStore(session_file) if session_file else None
+        self.html_parser = html_parser
+        self.seen_index = SeenIndex(seen_db, refresh_days) if seen_db else None
+        self.page_cache = PageCache(cache_file, ttl_hours=cache_ttl_hours) if cache_file else None
+        self.archive = PageArchive(archive_file) if archive_file else None
+        self.resource_policy = resource_policy or (ResourcePolicy() if lean_browser else None)
+        if fetch_mode != 'offline':
+            self.setup_browser(headless)
+
+    def setup_browser(self, headless=False, memory_mb=None):
         chrome_options = Options()
+        if memory_mb:
+            # محدود کردن حافظه هر نمونه Chrome (برای worker pool)
+            chrome_options.add_argument(f'--js-flags=--max-old-space-size={int(memory_mb)}')
+            chrome_options.add_argument('--renderer-process-limit=1')
+            chrome_options.add_argument('--disk-cache-size=1')
         chrome_options.add_argument('--disable-blink-features=AutomationControlled')
         chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
         chrome_options.add_experimental_option('useAutomationExtension', False)
@@ -62,9 +204,13 @@ class JobVisionScraper:
         )
         if headless:
             chrome_options.add_argument('--headless=new')
+        if self.resource_policy is not None:
+            self.resource_policy.configure(chrome_options)
 
         service = Service(executable_path=self.chromedriver_path)
         self.driver = webdriver.Chrome(service=service, options=chrome_options)
+        if self.resource_policy is not None:
+            self.resource_policy.attach(self.driver)
         try:
             # Hide webdriver flag
             self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
@@ -74,24 +220,29 @@ class JobVisionScraper:
     # -----------------------------
     # ورود (login) با تلاش‌های بیشتر برای کپچا
     # -----------------------------
+    @timed('login')
     def login_to_jobvision(self):
-        login_url = "https://account.jobvision.ir/Candidate"
+        login_url = f"{self.account_url}/Candidate"
         print("\n" + "="*60)
         print("LOGIN TO JOBVISION")
         print("="*60)
 
+        if self.session_store is not None and self.restore_session(login_url):
+            return True
+
         for attempt in range(1, self.max_login_attempts + 1):
             print(f"\nAttempt {attempt}/{self.max_login_attempts}")
+            if attempt > 1:
+                self.metrics.inc('retries')
             try:
-                self.driver.get(login_url)
+                self.navigate(login_url, 'login')
                 WebDriverWait(self.driver, 15).until(EC.presence_of_element_located((By.NAME, "Username")))
-                time.sleep(0.8)
+                self._wait(EC.element_to_be_clickable((By.NAME, "Username")), timeout=5, reason='login')
 
                 # وارد کردن ایمیل
                 email_input = self.driver.find_element(By.NAME, "Username")
                 email_input.clear()
                 email_input.send_keys(self.email)
-                time.sleep(0.3)
                 # کلیک روی دکمه ادامه (ممکن است `<a>` یا `<button>` باشد)
                 clicked = False
                 try:
@@ -110,7 +261,7 @@ class JobVisionScraper:
                     print("Couldn't find continue button after email — trying ENTER key")
                     email_input.send_keys(Keys.ENTER)
 
-                time.sleep(2)
+                self._wait(self._email_step_done, timeout=10, reason='login')
 
                 # اکنون ممکن است کپچا ظاهر شده باشد یا فیلد پسورد
                 # چرخه‌ی تلاش برای حل کپچا (و در صورت شکست، refresh و وارد کردن ایمیل دوباره)
@@ -123,14 +274,12 @@ class JobVisionScraper:
                         if not solved:
                             print("Auto-solve failed this cycle — refreshing and re-entering email/password")
                             self.driver.refresh()
-                            time.sleep(2)
                             # دوباره ایمیل را وارد کن
                             try:
                                 WebDriverWait(self.driver, 10).until(EC.presence_of_element_located((By.NAME, "Username")))
                                 e_in = self.driver.find_element(By.NAME, "Username")
                                 e_in.clear()
                                 e_in.send_keys(self.email)
-                                time.sleep(0.5)
                                 # click continue again
                                 try:
                                     cont = self.driver.find_element(By.CSS_SELECTOR, "a.btn.btn-primary")
@@ -141,7 +290,7 @@ class JobVisionScraper:
                                         self.driver.execute_script("arguments[0].click();", cont)
                                     except:
                                         e_in.send_keys(Keys.ENTER)
-                                time.sleep(2)
+                                self._wait(self._email_step_done, timeout=10, reason='login')
                             except Exception as e:
                                 print("After refresh couldn't re-enter email:", e)
                                 # continue to next refresh cycle
@@ -157,7 +306,6 @@ class JobVisionScraper:
                         passwd = WebDriverWait(self.driver, 8).until(EC.presence_of_element_located((By.NAME, "Password")))
                         passwd.clear()
                         passwd.send_keys(self.password)
-                        time.sleep(0.6)
                     except TimeoutException:
                         # ممکن است سایت کاربر را مستقیماً وارد کند یا صفحه متفاوت باشد — ادامه
                         pass
@@ -165,10 +313,15 @@ class JobVisionScraper:
                     # تلاش برای کلیک روی دکمه لاگین
                     self._try_click_login_button()
 
-                    # بررسی وضعیت لاگین
-                    time.sleep(2.5)
+                    # بررسی وضعیت لاگین: صبر تا خروج از سایت account یا ظاهر شدن دوباره‌ی کپچا
+                    self._wait(lambda d: self.account_site not in d.current_url or self.check_captcha_exists(),
+                               timeout=6, reason='login')
                     if self.is_logged_in():
                         print("Login successful!")
+                        if self.session_store is not None:
+                            self.session_store.save(self.driver)
+                        if self.fetch_mode == 'http':
+                            self.export_session_to_http()
                         return True
                     else:
                         # اگر لاگین نشد، ادامه به چرخه‌ی refresh_try
@@ -183,10 +336,50 @@ class JobVisionScraper:
             except Exception as e:
                 print("Error in attempt:", str(e)[:200])
 
-            time.sleep(2 + random.random()*2)
+            self.waits.sleep(2 + random.random()*2, 'login backoff')
 
         raise Exception("Login failed after multiple attempts")
 
+    def navigate(self, url, page_type='detail'):
+        """Load a page in Chrome under the resource policy (blocking, timeout and traffic stats for page_type)"""
+        self.metrics.inc('pages')
+        if self.resource_policy is not None:
+            transferred, timed_out = self.resource_policy.navigate(self.driver, url, page_type)
+            self.metrics.inc('bytes', transferred)
+            if timed_out:
+                self.metrics.inc('errors')
+        else:
+            self.driver.get(url)
+
+    def _wait(self, condition, timeout=10, reason='dom'):
+        return wait_for(self.driver, condition, timeout=timeout, tracker=self.waits, reason=reason)
+
+    def _email_step_done(self, driver):
+        """Condition: after submitting the email a captcha or the password field is shown (or we left the login site)"""
+        return (self.check_captcha_exists() or driver.find_elements(By.NAME, "Password")
+                or self.account_site not in driver.current_url)
+
+    def restore_session(self, login_url):
+        """Warm start: reuse the saved session if the site still accepts it"""
+        if not self.session_store.restore(self.driver):
+            return False
+        # با session معتبر، صفحه‌ی لاگین فرم را نشان نمی‌دهد (یا redirect می‌کند)
+        self.navigate(login_url, 'login')
+        try:
+            WebDriverWait(self.driver, 8).until(
+                lambda d: self.account_site not in d.current_url or d.find_elements(By.NAME, "Username"))
+        except TimeoutException:
+            pass
+        # فقط خروج واقعی از سایت لاگین یعنی session معتبر است - timeout یا صفحه‌ی نیمه‌کاره کافی نیست
+        if self.driver.find_elements(By.NAME, "Username") or not self.is_logged_in():
+            print("Saved session was rejected - running the full login")
+            self.session_store.clear()
+            return False
+        print("Restored saved session - skipping login")
+        if self.fetch_mode == 'http':
+            self.export_session_to_http()
+        return True
+
     def _try_click_login_button(self):
         # helper: تلاش می‌کند دکمه لاگین را کلیک کند (ممکن است چند selector وجود داشته باشد)
         try:
@@ -221,6 +414,7 @@ class JobVisionScraper:
         # در برخی پیاده‌سازی‌ها تصویری داخل iframe است؛ جلوگیری نمی‌کنیم ولی به صورت پایه بررسی می‌کنیم
         return False
 
+    @timed('captcha')
     def try_solve_captcha_with_retries(self):
         # تلاش چندباره برای حل کپچا که متد solve_arcaptcha را فراخوانی می‌کند
         for i in range(1, self.captcha_attempts + 1):
@@ -231,13 +425,15 @@ class JobVisionScraper:
                 ok = False
                 print("Captcha solver exception:", str(e)[:150])
             if ok:
-                # اگر حل شد، بلافاصله یک تاخیر کوتاه بدیم و ادامه بدیم
-                time.sleep(1.2 + random.random()*1.2)
+                # اگر حل شد، صبر تا فیلد پسورد ظاهر شود یا از صفحه لاگین خارج شویم
+                self._wait(lambda d: d.find_elements(By.NAME, "Password") or self.account_site not in d.current_url,
+                           timeout=4, reason='captcha')
                 # در بسیاری از مواقع بعد از حل کپچا، فیلد پسورد ظاهر می‌شود یا لاگین موفق می‌شود
                 return True
             else:
                 # اگر حل نشد، ممکنه slider برگشته باشه یا challenge مجدد ساخته شده — کمی صبر و تلاش مجدد
-                time.sleep(1.0 + random.random()*1.5)
+                self.metrics.inc('retries')
+                self.waits.sleep(1.0 + random.random()*1.5, 'captcha retry')
         return False
 
     # -----------------------------
@@ -251,7 +447,8 @@ class JobVisionScraper:
         3. اسلایدر را با حرکات کوچک انسانی حرکت می‌دهد
         """
         try:
-            time.sleep(1.0)
+            self._wait(EC.presence_of_element_located((By.CSS_SELECTOR, "#challenge img, .captcha-bg img, .challenge-bg img")),
+                       timeout=5, reason='captcha')
             # selectors متنوع برای سازگاری با پیاده‌سازی‌های مختلف
             bg_selectors = ["#challenge .tw-relative img", "#challenge img", ".captcha-bg img", ".challenge-bg img"]
             piece_selectors = ["#challenge .tw-absolute img.puzzle", "#challenge img.puzzle", ".captcha-piece img", ".puzzle-img"]
@@ -346,8 +543,8 @@ class JobVisionScraper:
                 except:
                     pass
 
-            # صبر برای بررسی نتیجه
-            time.sleep(2.0 + random.random()*1.5)
+            # صبر برای بررسی نتیجه: کپچا ناپدید شود
+            self._wait(lambda d: not self.check_captcha_exists(), timeout=4, reason='captcha')
 
             # بررسی این که آیا کپچا حذف شده یا فیلد پسورد ظاهر شده
             if not self.check_captcha_exists():
@@ -405,10 +602,9 @@ class JobVisionScraper:
     # -----------------------------
     def is_logged_in(self):
         try:
-            time.sleep(1.0)
             current_url = self.driver.current_url
             # اگر URL دیگر روی account.jobvision.ir نباشد، احتمالاً وارد شده است
-            if "account.jobvision.ir" not in current_url:
+            if self.account_site not in current_url:
                 return True
             # اگر فیلدهای Username/Password هنوز وجود دارد => لاگین نشده
             try:
@@ -420,10 +616,49 @@ class JobVisionScraper:
         except Exception:
             return False
 
+    # -----------------------------
+    # انتقال session لاگین شده به HTTP client
+    # -----------------------------
+    def export_session_to_http(self):
+        """Copy the logged-in browser's cookies and headers into a pooled HTTP session"""
+        if self.fetcher is None:
+            self.fetcher = HttpFetcher(pool_size=10, metrics=self.metrics)
+        self.fetcher.import_browser_session(self.driver)
+        print(f"HTTP session ready ({len(self.fetcher.session.cookies)} cookies)")
+        return self.fetcher
+
+    def session_expired(self, response):
+        """True when an HTTP response shows the exported session is no longer logged in"""
+        if response.status_code in (401, 403):
+            return True
+        if self.account_site in response.url:
+            return True
+        # فرم لاگین به جای صفحه آگهی
+        return 'name="Username"' in response.text or "name='Username'" in response.text
+
+    def fetch_job_html(self, url):
+        """Fetch a posting over HTTP; None means the browser has to handle it"""
+        response = self.fetcher.get(url)
+        if response is None:
+            return None
+        if self.session_expired(response):
+            print("HTTP session expired - falling back to the browser")
+            return None
+        if response.status_code != 200 or needs_javascript(response.text, DETAIL_MARKERS):
+            return None
+        return response.text
+
     # -----------------------------
     # استخراج لینک‌ها (برای صفحات SPA با استفاده از Selenium)
     # -----------------------------
-    def scrape_jobvision(self, keywords=['هوش مصنوعی', 'machine learning'], max_jobs_per_keyword=30):
+    def scrape_jobvision(self, keywords=['هوش مصنوعی', 'machine learning'], max_jobs_per_keyword=30,
+                         max_jobs=None, keyword_concurrency=1):
+        """max_jobs_per_keyword / max_jobs (None = unlimited) budget the postings fetched per keyword and per run
+
+        keyword_concurrency > 1 runs the keywords as concurrent tasks feeding one
+        de-duplicated detail queue (scheduler.py); with a single Chrome the
+        searches themselves still take turns.
+        """
         print("\n" + "="*60)
         print("SCRAPING JOBVISION")
         print("="*60)
@@ -431,250 +666,279 @@ class JobVisionScraper:
         if not self.is_logged_in():
             raise Exception("Not logged in — will not start scraping. Login is required.")
 
-        for keyword in keywords:
-            encoded = urllib.parse.quote(keyword)
-            url = f"https://jobvision.ir/jobs/keyword/{encoded}"
-            print(f"\nSearching: {keyword} -> {url}")
-            self.driver.get(url)
-            time.sleep(2)
-
-            # تلاش برای scroll تا همه کارت‌ها لود شوند
-            for _ in range(4):
-                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(1.2 + random.random()*1.0)
-
-            # منتظر باش تا حداقل یک لینک job در DOM ظاهر شود
+        if keyword_concurrency > 1:
+            from scheduler import Scheduler
+            from sources import JobVisionSource
+            scheduler = Scheduler([JobVisionSource(self)], sink=self.sink, rate_policy=self.rate_policy,
+                                  waits=self.waits, metrics=self.metrics, keyword_concurrency=keyword_concurrency,
+                                  max_jobs=max_jobs, max_jobs_per_keyword=max_jobs_per_keyword)
             try:
-                WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_all_elements_located((By.CSS_SELECTOR, "a[href*='/jobs/']"))
-                )
-            except TimeoutException:
-                print("No job links appeared after wait — saving debug snapshot.")
-                # ذخیره صفحه برای دیباگ (اختیاری)
-                try:
-                    with open("debug_search_results.html", "w", encoding="utf-8") as f:
-                        f.write(self.driver.page_source)
-                    self.driver.save_screenshot("debug_search_results.png")
-                    print("Saved debug_search_results.html and debug_search_results.png")
-                except:
-                    pass
+                scheduler.run(keywords, start=False)
+            finally:
+                scheduler.pool.shutdown(wait=True)
+            print(f"\nTotal: {self.job_count} unique jobs")
+            return
 
-            anchors = self.driver.find_elements(By.CSS_SELECTOR, "a[href*='/jobs/']")
-            unique_links = []
-            seen_ids = set()
-            for a in anchors:
-                try:
-                    href = a.get_attribute("href")
-                    if not href:
-                        continue
-                    href_clean = href.split('?')[0]
-                    if '/jobs/' not in href_clean:
+        run_start = self.job_count
+        for keyword in keywords:
+            if max_jobs is not None and self.job_count - run_start >= max_jobs:
+                print(f"\nReached max_jobs={max_jobs} - remaining keywords skipped")
+                break
+            if self.sink is not None and self.sink.keyword_done('JobVision', keyword):
+                print(f"\n'{keyword}' was finished before the restart - skipping")
+                continue
+            # همه‌ی زمان‌ها و شمارنده‌های این کلمه با برچسب آن ثبت می‌شوند
+            with self.metrics.labels(keyword=keyword):
+                url = self.search_url(keyword)
+                print(f"\nSearching: {keyword} -> {url}")
+                hrefs = self.search_links(url)
+                unique_links = []
+                known = 0
+                for job_id, href_clean in self.job_links(hrefs):
+                    if job_id in self.scraped_links:
                         continue
-                    # فیلتر کردن لینک‌هایی که خود صفحه جستجو را نشون می‌دهند
-                    if 'keyword' in href_clean and href_clean.endswith('/jobs/keyword'):
+                    if self.seen_index and not self.seen_index.needs_fetch('JobVision', job_id):
+                        # در اجراهای قبلی (به‌تازگی) گرفته شده
+                        known += 1
                         continue
-                    job_id = self.extract_job_id_from_url(href_clean)
-                    if job_id not in seen_ids and job_id not in self.scraped_links:
-                        seen_ids.add(job_id)
-                        unique_links.append(href_clean)
-                except Exception:
-                    continue
-
-            print(f"Found {len(unique_links)} unique jobs (raw anchors: {len(anchors)})")
-
-            initial_count = len(self.jobs)
-            processed = 0
-            skipped = 0
-            errors = 0
-
-            for idx, job_url in enumerate(unique_links[:max_jobs_per_keyword], 1):
-                print(f"\n[{idx}/{min(len(unique_links), max_jobs_per_keyword)}] Processing: {job_url}")
-                job_data = self.scrape_job_details(job_url)
-                if job_data:
-                    job_id = self.extract_job_id_from_url(job_url)
-                    if job_id not in self.scraped_links:
-                        self.scraped_links.add(job_id)
-                        self.jobs.append(job_data)
-                        processed += 1
-                        print(f"Saved: {job_data['title'][:60]}")
-                    else:
-                        skipped += 1
-                        print("Duplicate - skipped")
+                    unique_links.append(href_clean)
+
+                print(f"Found {len(unique_links)} unique jobs (raw anchors: {len(hrefs)})")
+                if known:
+                    print(f"Skipped {known} jobs already known from earlier runs")
+
+                # بودجه‌ی این کلمه: سقف هر کلمه و باقی‌مانده‌ی سقف کل اجرا
+                budget = len(unique_links)
+                if max_jobs_per_keyword is not None:
+                    budget = min(budget, max_jobs_per_keyword)
+                if max_jobs is not None:
+                    budget = min(budget, max(0, max_jobs - (self.job_count - run_start)))
+                batch = unique_links[:budget]
+
+                initial_count = self.job_count
+                processed = 0
+                skipped = 0
+                errors = 0
+
+                if self.pool_size > 1:
+                    processed, skipped, errors = self.scrape_details_pool(batch)
                 else:
-                    errors += 1
-                    print("Failed to extract data")
-                time.sleep(random.uniform(1.5, 3.0))
-
-            print(f"\nSummary for '{keyword}': Processed={processed}, Duplicates={skipped}, Errors={errors}")
-            print(f"{len(self.jobs)-initial_count} jobs extracted for '{keyword}'")
+                    for idx, job_url in enumerate(batch, 1):
+                        print(f"\n[{idx}/{len(batch)}] Processing: {job_url}")
+                        job_data = self.scrape_job_details(job_url)
+                        if job_data:
+                            job_id = self.extract_job_id_from_url(job_url)
+                            if job_id not in self.scraped_links:
+                                self.scraped_links.add(job_id)
+                                self._add_job(job_id, job_data)
+                                processed += 1
+                                print(f"Saved: {job_data['title'][:60]}")
+                            else:
+                                skipped += 1
+                                print("Duplicate - skipped")
+                        else:
+                            errors += 1
+                            print("Failed to extract data")
+
+                print(f"\nSummary for '{keyword}': Processed={processed}, Duplicates={skipped}, Errors={errors}")
+                print(f"{self.job_count - initial_count} jobs extracted for '{keyword}'")
+                if self.sink is not None:
+                    self.sink.finish_keyword('JobVision', keyword)
+
+        print(f"\nTotal: {self.job_count} unique jobs")
+        self.waits.report()
+        self.metrics.report()
+        if self.page_cache is not None:
+            self.page_cache.report()
+        if self.resource_policy is not None:
+            self.resource_policy.report()
+
+    def search_url(self, keyword):
+        return f"{self.base_url}/jobs/keyword/{urllib.parse.quote(keyword)}"
+
+    def job_links(self, hrefs):
+        """(job id, clean url) of each distinct posting among a search page's hrefs, in page order"""
+        links = []
+        seen_ids = set()
+        for href in hrefs:
+            try:
+                if not href:
+                    continue
+                href_clean = href.split('?')[0]
+                if '/jobs/' not in href_clean:
+                    continue
+                # فیلتر کردن لینک‌هایی که خود صفحه جستجو را نشون می‌دهند
+                if 'keyword' in href_clean and href_clean.endswith('/jobs/keyword'):
+                    continue
+                job_id = self.extract_job_id_from_url(href_clean)
+                if job_id not in seen_ids:
+                    seen_ids.add(job_id)
+                    links.append((job_id, href_clean))
+            except Exception:
+                continue
+        return links
+
+    def search_links(self, url):
+        """hrefs of every job anchor on a keyword search page (rendered in the browser, or from the page cache)"""
+        if self.page_cache is not None:
+            html = self.page_cache.get(url)
+            if html is not None:
+                soup = Document(html, self.html_parser, self.metrics).soup
+                return [urllib.parse.urljoin(url, a.get('href')) for a in soup.select("a[href*='/jobs/']")]
+
+        self.rate_policy.pace(url)
+        with self.metrics.phase('navigation'):
+            self.navigate(url, 'search')
+            # منتظر باش تا حداقل یک لینک job در DOM ظاهر شود
+            job_links = self._wait(EC.presence_of_all_elements_located((By.CSS_SELECTOR, "a[href*='/jobs/']")),
+                                   timeout=10, reason='page load')
+        if job_links:
+            # scroll تا وقتی که تعداد لینک‌ها دیگر زیاد نشود
+            with self.metrics.phase('scroll'):
+                scroll_until_stable(self.driver, "a[href*='/jobs/']", max_scrolls=4, tracker=self.waits)
+            self._keep_page(url, self.driver.page_source, kind='search')
+        else:
+            print("No job links appeared after wait — saving debug snapshot.")
+            # ذخیره صفحه برای دیباگ (اختیاری)
+            try:
+                with open("debug_search_results.html", "w", encoding="utf-8") as f:
+                    f.write(self.driver.page_source)
+                self.driver.save_screenshot("debug_search_results.png")
+                print("Saved debug_search_results.html and debug_search_results.png")
+            except:
+                pass
 
-        print(f"\nTotal: {len(self.jobs)} unique jobs")
+        # همه‌ی hrefها با یک round trip؛ فیلتر و استخراج ID در پایتون انجام می‌شود
+        return self.driver.execute_script(JOB_HREFS_SCRIPT, "a[href*='/jobs/']") or []
 
     # -----------------------------
     # استخراج جزئیات هر آگهی (ترکیبی از Selenium + BeautifulSoup)
     # -----------------------------
     def scrape_job_details(self, url):
         try:
-            self.driver.get(url)
+            page = self.fetch_job_page(url)
+            record = self.parse_job_details(url=url, **page)
+
+        except Exception as e:
+            print("Error in scrape_job_details:", str(e)[:200])
+            record = None
+        if record is None:
+            self.metrics.inc('errors')
+        return record
+
+    def fetch_job_page(self, url):
+        """A posting's HTML (plus title/company/sections when Chrome rendered it) - cache, HTTP, then browser"""
+        if self.page_cache is not None:
+            html = self.page_cache.get(url)
+            if html is not None:
+                return {'html': html}
+
+        self.rate_policy.pace(url)
+        if self.fetcher is not None:
+            with self.metrics.phase('navigation'):
+                html = self.fetch_job_html(url)
+            if html is not None:
+                self._keep_page(url, html)
+                return {'html': html}
+
+        with self.metrics.phase('navigation'):
+            self.navigate(url, 'detail')
             # منتظر title یا عنصر مشخصی که معمولا وجود دارد باش
-            possible_title_selectors = [
-                "h1", ".job-card-title", ".job-title", "h2", "div.job-title"
-            ]
-            title = "N/A"
+            self._wait(EC.presence_of_element_located((By.CSS_SELECTOR, "h1, a[href*='/companies/']")),
+                       timeout=10, reason='page load')
+            # عنوان، شرکت، بخش‌ها و HTML با یک اسکریپت
             try:
-                for sel in possible_title_selectors:
-                    els = self.driver.find_elements(By.CSS_SELECTOR, sel)
-                    if els:
-                        candidate = els[0].text.strip()
-                        if candidate and len(candidate) > 5:
-                            title = candidate
-                            break
-                # اگر با Selenium چیزی پیدا نشد از BeautifulSoup استفاده کن
-                if title == "N/A":
-                    soup = BeautifulSoup(self.driver.page_source, "html.parser")
-                    for tag in soup.find_all(['h1', 'h2']):
-                        txt = tag.get_text(strip=True)
-                        if 10 < len(txt) < 150:
-                            title = txt
-                            break
-            except Exception:
-                pass
+                payload = self.driver.execute_script(DETAIL_SCRIPT, TITLE_SELECTORS, ', '.join(SECTION_HEADERS),
+                                                     SECTION_SIBLINGS)
+                title = next((t for t in (payload['titles'] or []) if t and len(t) > 5), "N/A")
+                company = payload['company'] if payload['company'] is not None else "N/A"
+                html = payload['html']
+                sections = payload['sections']
+                if not isinstance(html, str):
+                    raise ValueError("no html in payload")
+            except Exception as e:
+                # خطای اسکریپت یا خروجی غیرمنتظره - همه‌ی فیلدها از HTML صفحه با BeautifulSoup
+                print("Detail script failed, parsing the page HTML instead:", str(e)[:150])
+                html = self.driver.page_source
+                self._keep_page(url, html)
+                return {'html': html}
+        self._keep_page(url, html)
+        if self.fetcher is not None:
+            # مرورگر احتمالاً session را تازه کرده است
+            self.fetcher.import_browser_session(self.driver)
+        return {'html': html, 'title': title, 'company': company, 'sections': sections}
+
+    def _keep_page(self, url, html, kind='detail'):
+        """Store a freshly downloaded page in the page cache and the raw archive"""
+        # صفحه‌ی آگهی که هنوز کامل render نشده نگه داشته نمی‌شود
+        if kind == 'detail' and needs_javascript(html, DETAIL_MARKERS):
+            return
+        if self.page_cache is not None:
+            self.page_cache.put(url, html)
+        if self.archive is not None:
+            self.archive.add(url, 'JobVision', html, kind)
+
+    @timed('extract')
+    def parse_job_details(self, html, url, title="N/A", company="N/A", sections=None):
+        """Extract a job record from a posting's HTML (no browser needed)
+
+        sections: [(header text, texts of the following siblings)] as returned by
+        DETAIL_SCRIPT; without it the headers are found in the parsed HTML.
+        """
+        try:
+            # صفحه فقط یک بار parse می‌شود
+            doc = Document(html, self.html_parser, self.metrics)
+            soup = doc.soup
+
+            # اگر با Selenium چیزی پیدا نشد از BeautifulSoup استفاده کن
+            if title == "N/A":
+                for sel in TITLE_SELECTORS:
+                    el = soup.select_one(sel)
+                    candidate = el.get_text(strip=True) if el else ""
+                    if candidate and len(candidate) > 5:
+                        title = candidate
+                        break
+            if title == "N/A":
+                for tag in soup.find_all(['h1', 'h2']):
+                    txt = tag.get_text(strip=True)
+                    if 10 < len(txt) < 150:
+                        title = txt
+                        break
 
             # تکمیل و تمیز کردن عنوان
             if title != "N/A":
                 title = re.split(r'[،\|]', title)[0].strip()
                 title = re.sub(r'\s*\d+\s*(روز|ساعت|دقیقه)\s*پیش.*$', '', title)
 
-            # شرکت
-            company = "N/A"
-            try:
-                el = self.driver.find_elements(By.CSS_SELECTOR, "a[href*='/companies/']")
-                if el:
-                    company = el[0].text.strip()
-            except:
-                pass
             if company == "N/A":
-                soup = BeautifulSoup(self.driver.page_source, "html.parser")
                 ctag = soup.find('a', href=re.compile(r'/companies/'))
                 if ctag:
                     company = ctag.get_text(strip=True)
 
             # متن کامل برای regex fallback
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-            full_text = soup.get_text(separator="\n")
-
-            # مکان (location) با regex‌ها و fallback
-            location = "N/A"
-            location_patterns = [
-                r'(تهران)\s*،\s*([^\n،]+)',
-                r'(اصفهان)\s*،\s*([^\n،]+)',
-                r'(مشهد)\s*،\s*([^\n،]+)',
-                r'(شیراز)\s*،\s*([^\n،]+)',
-                r'(کرج)\s*،\s*([^\n،]+)',
-            ]
-            for pattern in location_patterns:
-                match = re.search(pattern, full_text)
-                if match:
-                    location = f"{match.group(1)}، {match.group(2)}"
-                    break
-            if location == "N/A":
-                cities = ['تهران', 'اصفهان', 'شیراز', 'مشهد', 'کرج', 'تبریز']
-                for city in cities:
-                    if city in full_text:
-                        location = city
-                        break
+            full_text = doc.text("\n")
 
-            # نوع همکاری و ساعات کاری
-            working_hours = "N/A"
-            time_pattern = r'(شنبه\s+تا\s+\w+\s+از\s+ساعت\s+[\d:]+\s+تا\s+[\d:]+)'
-            time_match = re.search(time_pattern, full_text)
-            if time_match:
-                working_hours = time_match.group(1)
-            elif 'تمام‌وقت' in full_text or 'تمام وقت' in full_text:
-                working_hours = 'تمام‌وقت'
-            elif 'پاره‌وقت' in full_text:
-                working_hours = 'پاره‌وقت'
-            elif 'دورکاری' in full_text or 'remote' in full_text.lower():
-                working_hours = 'دورکاری'
-
-            contract_type = "N/A"
-            if 'تمام وقت' in full_text or 'تمام‌وقت' in full_text:
-                contract_type = 'تمام وقت'
-            elif 'پاره وقت' in full_text or 'پاره‌وقت' in full_text:
-                contract_type = 'پاره وقت'
-            elif 'پروژه‌ای' in full_text:
-                contract_type = 'پروژه‌ای'
-            elif 'قراردادی' in full_text:
-                contract_type = 'قراردادی'
-
-            # حقوق
-            salary = "N/A"
-            salary_patterns = [
-                r'(\d+)\s*-\s*(\d+)\s*میلیون\s*تومان',
-                r'(\d{1,3}(?:[,،]\d{3})*)\s*تومان',
-                r'حقوق[:\s]+(\d+(?:\s*-\s*\d+)?)',
-            ]
-            for pattern in salary_patterns:
-                match = re.search(pattern, full_text)
-                if match:
-                    salary = match.group(0)
-                    break
-            if salary == "N/A" and 'توافقی' in full_text:
-                salary = 'توافقی'
+            # مکان، ساعات کاری، نوع همکاری و حقوق - همه با یک بار پیمایش متن (field_rules.py)
+            fields = JOBVISION_FIELDS.extract(full_text)
+            location = fields['location']
+            working_hours = fields['working_hours']
+            contract_type = fields['contract_type']
+            salary = fields['salary']
 
             # استخراج شرح شغل، شرایط و شاخص‌ها (fallback با جستجوی هدرها)
+            if sections is None:
+                # sibling‌ها فقط برای هدرهایی که لازم می‌شوند خوانده می‌شوند
+                sections = [(h.get_text(strip=True), h) for h in soup.find_all(SECTION_HEADERS)]
             requirements_parts = []
-            key_indicators = []
-            if 'شاخص' in full_text and 'کلیدی' in full_text:
-                for header in soup.find_all(['h2', 'h3', 'h4', 'h5', 'strong']):
-                    if 'شاخص' in header.get_text() and 'کلیدی' in header.get_text():
-                        next_elem = header.find_next_sibling()
-                        count = 0
-                        while next_elem and count < 10:
-                            if next_elem.name in ['h2', 'h3', 'h4', 'h5']:
-                                break
-                            text = next_elem.get_text(strip=True)
-                            if text and len(text) > 10:
-                                key_indicators.append(text)
-                            next_elem = next_elem.find_next_sibling()
-                            count += 1
-                        break
+            key_indicators = section_items(sections, lambda h: 'شاخص' in h and 'کلیدی' in h, 10)
             if key_indicators:
                 requirements_parts.append("شاخص‌های کلیدی:\n" + "\n".join(f"• {item}" for item in key_indicators))
 
-            job_desc = []
-            for header in soup.find_all(['h2', 'h3', 'h4', 'h5', 'strong']):
-                header_text = header.get_text(strip=True)
-                if any(kw in header_text for kw in ['شرح شغل', 'وظایف', 'مسئولیت']):
-                    next_elem = header.find_next_sibling()
-                    count = 0
-                    while next_elem and count < 12:
-                        if next_elem.name in ['h2', 'h3', 'h4', 'h5']:
-                            break
-                        text = next_elem.get_text(strip=True)
-                        if text and len(text) > 10:
-                            job_desc.append(text)
-                        next_elem = next_elem.find_next_sibling()
-                        count += 1
-                    break
+            job_desc = section_items(sections, lambda h: any(kw in h for kw in ['شرح شغل', 'وظایف', 'مسئولیت']), 12)
             if job_desc:
                 requirements_parts.append("شرح شغل و وظایف:\n" + "\n".join(f"• {item}" for item in job_desc))
 
-            qualifications = []
-            for header in soup.find_all(['h2', 'h3', 'h4', 'h5', 'strong']):
-                header_text = header.get_text(strip=True)
-                if any(kw in header_text for kw in ['شرایط احراز', 'الزامات', 'مهارت']):
-                    next_elem = header.find_next_sibling()
-                    count = 0
-                    while next_elem and count < 12:
-                        if next_elem.name in ['h2', 'h3', 'h4', 'h5']:
-                            break
-                        text = next_elem.get_text(strip=True)
-                        if text and len(text) > 10:
-                            qualifications.append(text)
-                        next_elem = next_elem.find_next_sibling()
-                        count += 1
-                    break
+            qualifications = section_items(sections, lambda h: any(kw in h for kw in ['شرایط احراز', 'الزامات', 'مهارت']), 12)
             if qualifications:
                 requirements_parts.append("شرایط احراز:\n" + "\n".join(f"• {item}" for item in qualifications))
 
@@ -696,58 +960,198 @@ class JobVisionScraper:
             }
 
         except Exception as e:
-            print("Error in scrape_job_details:", str(e)[:200])
+            print("Error in parse_job_details:", str(e)[:200])
             return None
 
+    # -----------------------------
+    # worker pool: چند مرورگر موازی برای صفحات آگهی
+    # -----------------------------
+    def spawn_worker(self):
+        """Start another Chrome that shares this scraper's login (cookies are copied over)
+
+        The worker only fetches and parses postings: it has its own driver and
+        records, and shares on purpose just the pacing, cache, archive, HTTP
+        session and metrics. Results go back through scrape_details_pool.
+        """
+        worker = JobVisionScraper(self.email, self.password, headless=self.headless,
+                                  chromedriver_path=self.chromedriver_path, fetch_mode='offline',
+                                  session_file=None, html_parser=self.html_parser,
+                                  resource_policy=self.resource_policy, metrics=self.metrics,
+                                  base_url=self.base_url, account_url=self.account_url)
+        # منابع مشترک - همه thread-safe هستند
+        worker.fetch_mode = self.fetch_mode
+        worker.rate_policy = self.rate_policy
+        worker.waits = self.waits
+        worker.page_cache = self.page_cache
+        worker.archive = self.archive
+        worker.fetcher = self.fetcher
+        worker.setup_browser(self.headless, memory_mb=self.worker_memory_mb)
+        try:
+            current = urllib.parse.urlparse(self.driver.current_url)
+            worker.navigate(f"{current.scheme}://{current.netloc}/", 'home')
+            for cookie in self.driver.get_cookies():
+                cookie.pop('sameSite', None)
+                try:
+                    worker.driver.add_cookie(cookie)
+                except Exception:
+                    pass
+        except Exception as e:
+            print("Could not copy login cookies to worker:", str(e)[:150])
+        return worker
+
+    def _browser_memory_mb(self):
+        """JS heap in use by this worker's Chrome, in MB (None if unavailable)"""
+        try:
+            self.driver.execute_cdp_cmd('Performance.enable', {})
+            metrics = self.driver.execute_cdp_cmd('Performance.getMetrics', {})['metrics']
+            used = next(m['value'] for m in metrics if m['name'] == 'JSHeapUsedSize')
+            return used / (1024 * 1024)
+        except Exception:
+            return None
+
+    def scrape_details_pool(self, urls):
+        """Scrape postings with pool_size browsers pulling from a shared queue
+
+        Results are merged into self.jobs / self.scraped_links under a lock.
+        Returns (processed, duplicates, errors) like the sequential loop.
+        """
+        work = queue.Queue()
+        for url in urls:
+            work.put(url)
+        lock = threading.Lock()
+        counts = {'processed': 0, 'duplicates': 0, 'errors': 0}
+        per_worker = []
+
+        workers = [self]
+        for _ in range(min(self.pool_size, len(urls)) - 1):
+            try:
+                workers.append(self.spawn_worker())
+            except Exception as e:
+                print("Could not start pool worker:", str(e)[:150])
+        print(f"Worker pool: {len(workers)} browsers, {len(urls)} postings, "
+              f"memory cap={self.worker_memory_mb or 'default'} MB per browser, "
+              f"rate={self.rate_policy.rate}/s for the whole pool")
+
+        def run(worker, index):
+            done = 0
+            while True:
+                try:
+                    job_url = work.get_nowait()
+                except queue.Empty:
+                    break
+                job_data = worker.scrape_job_details(job_url)
+                job_id = self.extract_job_id_from_url(job_url)
+                with lock:
+                    if not job_data:
+                        counts['errors'] += 1
+                        print(f"[w{index}] Failed to extract data: {job_url}")
+                    elif job_id in self.scraped_links:
+                        counts['duplicates'] += 1
+                    else:
+                        self.scraped_links.add(job_id)
+                        self._add_job(job_id, job_data)
+                        counts['processed'] += 1
+                        done += 1
+                        print(f"[w{index}] Saved: {job_data['title'][:60]}")
+            per_worker.append((index, done, worker._browser_memory_mb()))
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=self.metrics.bind(run), args=(w, i), daemon=True)
+                   for i, w in enumerate(workers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+
+        for worker in workers[1:]:
+            try:
+                worker.driver.quit()
+            except Exception:
+                pass
+
+        total = counts['processed'] + counts['duplicates'] + counts['errors']
+        print(f"Pool finished {total} postings in {elapsed:.1f}s "
+              f"({total / elapsed if elapsed else 0:.2f} postings/s)")
+        for index, done, memory in sorted(per_worker):
+            mem = f"{memory:.0f} MB JS heap" if memory is not None else "memory n/a"
+            print(f"   worker {index}: {done} saved, {mem}")
+        return counts['processed'], counts['duplicates'], counts['errors']
+
+    @timed('save')
+    def _add_job(self, job_id, job_data):
+        """Record a scraped posting: self.jobs, the streaming sink and the seen index"""
+        self.job_count += 1
+        if self.keep_jobs:
+            self.jobs.append(job_data)
+        if self.sink is not None:
+            self.sink.write('JobVision', job_id, job_data)
+        if self.seen_index is not None:
+            self.seen_index.mark('JobVision', job_id, job_data['link'])
+
     def extract_job_id_from_url(self, url):
-        match = re.search(r'/jobs/(\d+)', url)
-        return match.group(1) if match else url
+        return jobvision_job_id(url)
 
     # -----------------------------
     # ذخیره‌سازی نهایی
     # -----------------------------
-    def save_to_excel(self, filename='jobs.xlsx'):
-        if not self.jobs:
-            print("No jobs to save")
-            return
+    @timed('save')
+    def save_to_excel(self, filename='jobs.xlsx', records=None):
+        """Stream records (self.jobs by default, or any iterable such as excel_export.read_jsonl(...)) to .xlsx
 
-        print(f"\nPreparing to save {len(self.jobs)} jobs...")
-        df = pd.DataFrame(self.jobs)
-        columns = ['date_added', 'title', 'company', 'location', 'requirements',
-                   'salary', 'contract_type', 'working_hours', 'link', 'source']
-        df = df[columns]
+        In incremental mode (seen_db) a run only holds the new postings, so they
+        are added to the rows already in the file instead of replacing them.
+        """
+        incremental = self.seen_index is not None
+        if records is None:
+            records = self.jobs
+            if not records:
+                print("No jobs to save")
+                return
+            print(f"\nPreparing to save {len(records)} jobs...")
+
+        added = 0
+
+        def counted(rows):
+            # write_excel در حالت append تعداد کل سطرها (با سطرهای قبلی) را برمی‌گرداند
+            nonlocal added
+            for row in rows:
+                added += 1
+                yield row
 
         try:
-            with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-                df.to_excel(writer, index=False, sheet_name='Jobs')
-                worksheet = writer.sheets['Jobs']
-                worksheet.column_dimensions['A'].width = 20
-                worksheet.column_dimensions['B'].width = 40
-                worksheet.column_dimensions['C'].width = 30
-                worksheet.column_dimensions['D'].width = 25
-                worksheet.column_dimensions['E'].width = 60
-                worksheet.column_dimensions['F'].width = 25
-                worksheet.column_dimensions['G'].width = 20
-                worksheet.column_dimensions['H'].width = 30
-                worksheet.column_dimensions['I'].width = 50
-                worksheet.column_dimensions['J'].width = 15
-
-                from openpyxl.styles import Alignment
-                for row in range(2, len(df) + 2):
-                    worksheet[f'E{row}'].alignment = Alignment(wrap_text=True, vertical='top')
-
-            print(f"Successfully saved {len(df)} jobs to {filename}")
+            total = write_excel(counted(records), filename, append=incremental)
+            if incremental:
+                print(f"Successfully added {added} jobs to {filename} (workbook now has {total} rows)")
+            else:
+                print(f"Successfully saved {added} jobs to {filename}")
         except Exception as e:
             print("Error saving Excel:", e)
-            csv_filename = filename.replace('.xlsx', '.csv')
-            df.to_csv(csv_filename, index=False, encoding='utf-8-sig')
-            print(f"Saved as CSV backup: {csv_filename}")
+            if isinstance(records, list):
+                csv_filename = filename.replace('.xlsx', '.csv')
+                df = pd.DataFrame(records)[[c for c, _, _ in COLUMN_LAYOUT]]
+                if incremental and os.path.exists(csv_filename):
+                    # مثل Jobinja: در حالت incremental به انتهای فایل قبلی اضافه می‌شود
+                    df.to_csv(csv_filename, mode='a', header=False, index=False, encoding='utf-8')
+                else:
+                    df.to_csv(csv_filename, index=False, encoding='utf-8-sig')
+                print(f"Saved as CSV backup: {csv_filename}")
 
     def close(self):
         try:
             self.driver.quit()
         except Exception:
             pass
+        if self.fetcher is not None:
+            self.fetcher.close()
+        if self.seen_index is not None:
+            self.seen_index.close()
+        if self.page_cache is not None:
+            self.page_cache.close()
+        if self.archive is not None:
+            self.archive.close()
+        if self.sink is not None:
+            self.sink.close()
 
 # -----------------------------
 # اجرای نمونه (main)
@@ -756,22 +1160,65 @@ if __name__ == "__main__":
     # توصیه: ایمیل/پسورد را از متغیر محیطی بخوان یا از کاربر بپرس
     EMAIL = os.environ.get("JOBVISION_EMAIL") or input("Email for JobVision: ").strip()
     PASSWORD = os.environ.get("JOBVISION_PASSWORD") or input("Password for JobVision: ").strip()
+    # --profile[=prefix] -> نمونه‌برداری stack برای flame graph + جدول CPU/wall هر مرحله (profiling.py)
+    profile_prefix = profile_arg(sys.argv, 'profile_jobvision')
+    profiler = (RunProfiler(profile_prefix).instrument(JobVisionScraper, JOBVISION_STAGES).start()
+                if profile_prefix else None)
 
     scraper = JobVisionScraper(email=EMAIL, password=PASSWORD, headless=False,
                                chromedriver_path='chromedriver.exe',
                                max_login_attempts=5,
                                captcha_attempts_per_cycle=3,
-                               refresh_cycles=3)
+                               refresh_cycles=3,
+                               fetch_mode=os.environ.get("JOBVISION_FETCH_MODE", "browser"),
+                               pool_size=int(os.environ.get("JOBVISION_POOL_SIZE", "1")),
+                               # JOBVISION_WORKER_MEMORY_MB=512 -> سقف heap جاوااسکریپت هر Chrome در pool
+                               worker_memory_mb=(int(os.environ["JOBVISION_WORKER_MEMORY_MB"])
+                                                 if os.environ.get("JOBVISION_WORKER_MEMORY_MB") else None),
+                               # JOBVISION_REQUEST_RATE=2 -> سقف درخواست در ثانیه برای کل pool (نه برای هر worker)
+                               request_rate=float(os.environ.get("JOBVISION_REQUEST_RATE", "0.5")),
+                               seen_db=os.environ.get("SEEN_JOBS_DB"),
+                               cache_file=os.environ.get("PAGE_CACHE"),
+                               archive_file=os.environ.get("PAGE_ARCHIVE"),
+                               # STREAM_OUTPUT=jobvision_stream -> رکوردها فقط در jobvision_stream.csv/.jsonl (حافظه ثابت)
+                               sink=RecordSink.at(os.environ["STREAM_OUTPUT"]) if os.environ.get("STREAM_OUTPUT") else None,
+                               keep_jobs=not os.environ.get("STREAM_OUTPUT"),
+                               lean_browser=os.environ.get("BROWSER_PROFILE", "lean") != "full",
+                               # JOBVISION_BASE_URL=http://127.0.0.1:8800 JOBVISION_ACCOUNT_URL=http://127.0.0.1:8800/account
+                               # -> سرور محلی fake_board.py به جای سایت واقعی
+                               base_url=os.environ.get("JOBVISION_BASE_URL", "https://jobvision.ir"),
+                               account_url=os.environ.get("JOBVISION_ACCOUNT_URL", "https://account.jobvision.ir"))
     try:
         if scraper.login_to_jobvision():
-            time.sleep(1)
             # مثال: کلمات کلیدی و حداکثر تعداد را تنظیم کن
-            scraper.scrape_jobvision(keywords=["هوش مصنوعی", "machine learning"], max_jobs_per_keyword=30)
-            scraper.save_to_excel("jobvision_jobs_fixed.xlsx")
+            keywords = ["هوش مصنوعی", "machine learning"]
+            # MAX_JOBS=200 caps the postings fetched over all keywords
+            scraper.scrape_jobvision(keywords=keywords, max_jobs_per_keyword=30,
+                                     max_jobs=int(os.environ["MAX_JOBS"]) if os.environ.get("MAX_JOBS") else None)
+            if scraper.sink is not None and scraper.sink.all_done('JobVision', keywords):
+                scraper.sink.finish()
+            if scraper.sink is not None and not scraper.keep_jobs:
+                # رکوردها فقط روی دیسک هستند - خروجی Excel مستقیم از فایل JSONL ساخته می‌شود
+                # (فقط رکوردهای این اجرا؛ فایل JSONL رکوردهای اجراهای قبلی را هم دارد)
+                scraper.sink.flush()
+                scraper.save_to_excel("jobvision_jobs_fixed.xlsx",
+                                      records=read_jsonl(scraper.sink.jsonl_path, offset=scraper.sink.jsonl_start))
+            else:
+                scraper.save_to_excel("jobvision_jobs_fixed.xlsx")
         else:
             print("Login failed, aborting scraping.")
     except Exception as e:
         print("Fatal error:", e)
     finally:
+        if os.environ.get("METRICS_OUTPUT"):
+            # METRICS_OUTPUT=run_metrics -> run_metrics.prom (متن Prometheus) + run_metrics.json (گزارش اجرا)
+            # خطای نوشتن (مثلاً پوشه‌ی ناموجود) نباید مانع بستن مرورگر شود
+            try:
+                print("Metrics written to", ", ".join(scraper.metrics.write(os.environ["METRICS_OUTPUT"])))
+            except OSError as e:
+                print("Could not write metrics:", e)
+        if profiler is not None:
+            # پیش از input تا زمان انتظار کاربر در پروفایل نیاید
+            profiler.stop()
         input("\nPress Enter to close and quit the browser...")
         scraper.close()
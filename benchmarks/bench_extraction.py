@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+"""
+Offline benchmarks of the extraction and export hot paths - no browser, no network.
+
+Runs over saved pages in benchmarks/fixtures/<kind>/*.html (kinds:
+jobinja_listing, jobinja_detail, jobvision_detail, jobvision_search; a
+debug_search_results.html dump counts as a JobVision search page) and fills
+in any kind that has no saved pages with synthetic ones (fake_pages.py).
+Every benchmark runs at each corpus size; the corpus is cycled to reach it.
+Throughput is the best of --repeat runs, peak memory is measured in a
+separate run under tracemalloc. The extraction benchmarks also check their
+output: when too many records come back without a title, company or
+requirements, the run fails - a broken parser must not pass for a speed-up.
+parse_legacy / parse_document compare the old three-parse detail path with
+one Document parse; run with --parser lxml and --parser html.parser to
+compare the backends.
+
+    python benchmarks/bench_extraction.py                          # compare with benchmarks/baseline.json if present
+    python benchmarks/bench_extraction.py --save-baseline benchmarks/baseline.json
+    python benchmarks/bench_extraction.py --sizes 100,1000 --only xlsx,csv_stream
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+from bs4 import BeautifulSoup
+
+import fake_pages
+from excel_export import write_excel
+from html_doc import Document
+from Jobinja_scraper import JobScraper
+from job_ids import jobinja_job_id
+from Jobvision_scraper import JobVisionScraper
+from output_sink import RecordSink
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+KINDS = ('jobinja_listing', 'jobinja_detail', 'jobvision_detail', 'jobvision_search')
+SYNTHETIC_PAGES = 20
+DEBUG_SEARCH_PAGE = os.path.join(REPO, 'debug_search_results.html')
+# share of records an extraction benchmark must fill in (saved pages may genuinely lack a field)
+MIN_FILLED = 0.9
+
+
+def load_corpus(fixtures=FIXTURES):
+    """{kind: [html, ...]} from saved pages, synthetic pages where none are saved; plus where each came from"""
+    corpus, origin = {}, {}
+    for kind in KINDS:
+        paths = sorted(glob.glob(os.path.join(fixtures, kind, '*.html')))
+        if kind == 'jobvision_search' and os.path.exists(DEBUG_SEARCH_PAGE):
+            paths.append(DEBUG_SEARCH_PAGE)
+        pages = []
+        for path in paths:
+            with open(path, encoding='utf-8', errors='replace') as f:
+                pages.append(f.read())
+        corpus[kind], origin[kind] = pages, f"{len(pages)} saved"
+    if not corpus['jobinja_listing']:
+        ids = fake_pages.jobinja_job_ids(SYNTHETIC_PAGES * 20)
+        corpus['jobinja_listing'] = [fake_pages.jobinja_listing_page(ids[i:i + 20]) for i in range(0, len(ids), 20)]
+        origin['jobinja_listing'] = f"{SYNTHETIC_PAGES} synthetic"
+    for kind, make, ids in (('jobinja_detail', fake_pages.jobinja_detail_page, fake_pages.jobinja_job_ids),
+                            ('jobvision_detail', fake_pages.jobvision_detail_page, fake_pages.jobvision_job_ids)):
+        if not corpus[kind]:
+            corpus[kind] = [make(job_id) for job_id in ids(SYNTHETIC_PAGES)]
+            origin[kind] = f"{SYNTHETIC_PAGES} synthetic"
+    if not corpus['jobvision_search']:
+        ids = fake_pages.jobvision_job_ids(SYNTHETIC_PAGES * 20)
+        corpus['jobvision_search'] = [fake_pages.jobvision_search_page(ids[i:i + 20]) for i in range(0, len(ids), 20)]
+        origin['jobvision_search'] = f"{SYNTHETIC_PAGES} synthetic"
+    return corpus, origin
+
+
+def cycle(items, n):
+    return list(itertools.islice(itertools.cycle(items), n))
+
+
+class Suite:
+    """Each bench_<name>(n) prepares its inputs and returns a callable that processes n items"""
+
+    def __init__(self, corpus, html_parser='auto'):
+        self.corpus = corpus
+        self.html_parser = html_parser
+        self.jobinja = JobScraper(fetch_mode='offline', session_file=None, html_parser=html_parser)
+        self.jobvision = JobVisionScraper('', '', fetch_mode='offline', session_file=None, html_parser=html_parser)
+        self.cards = [card for html in corpus['jobinja_listing']
+                      for card in Document(html, html_parser).soup.find_all('li', class_='c-jobListView__item')]
+        self.hrefs = [a.get('href') for html in corpus['jobvision_search']
+                      for a in Document(html, html_parser).soup.select("a[href*='/jobs/']")]
+        self.records = [self.jobvision.parse_job_details(html, f"https://jobvision.ir/jobs/{1000000 + i}")
+                        for i, html in enumerate(corpus['jobvision_detail'])]
+        self.records = [r for r in self.records if r] or [{'title': 'N/A', 'link': ''}]
+        self.tmp = tempfile.mkdtemp(prefix='bench_')
+
+    def bench_parse_legacy(self, n):
+        # the detail path before Document: three html.parser parses of every posting
+        pages = cycle(self.corpus['jobvision_detail'], n)
+
+        def run():
+            for html in pages:
+                BeautifulSoup(html, 'html.parser').find_all(['h1', 'h2'])
+                BeautifulSoup(html, 'html.parser').find('a')
+                BeautifulSoup(html, 'html.parser').get_text(separator="\n")
+        return run
+
+    def bench_parse_document(self, n):
+        # the same lookups on one Document parse, with --parser's backend
+        pages = cycle(self.corpus['jobvision_detail'], n)
+
+        def run():
+            for html in pages:
+                doc = Document(html, self.html_parser)
+                doc.soup.find_all(['h1', 'h2'])
+                doc.soup.find('a')
+                doc.text("\n")
+        return run
+
+    def bench_parse_jobinja_card(self, n):
+        cards = cycle(self.cards, n)
+        return lambda: [self.jobinja.parse_jobinja_card(card, fetch_details=False) for card in cards]
+
+    def bench_get_job_details(self, n):
+        # what get_job_details does once the page is fetched
+        pages = cycle(self.corpus['jobinja_detail'], n)
+        return lambda: [self.jobinja.extract_job_details(Document(html, self.html_parser).soup) for html in pages]
+
+    def bench_scrape_job_details(self, n):
+        # what scrape_job_details does once the page is fetched (no DETAIL_SCRIPT sections - parsed from HTML)
+        pages = cycle(self.corpus['jobvision_detail'], n)
+        return lambda: [self.jobvision.parse_job_details(html, 'https://jobvision.ir/jobs/1') for html in pages]
+
+    def bench_dedup(self, n):
+        # Jobinja card IDs against the scraped set, then JobVision search hrefs through job_links
+        cards = cycle(self.cards, n)
+        hrefs = [f"https://jobvision.ir{h}" if h.startswith('/') else h for h in cycle(self.hrefs, n)]
+
+        def run():
+            scraped = set()
+            for card in cards:
+                job_id = jobinja_job_id(self.jobinja.card_link(card))
+                if job_id not in scraped:
+                    scraped.add(job_id)
+            return self.jobvision.job_links(hrefs)
+        return run
+
+    def bench_csv_pandas(self, n):
+        records = cycle(self.records, n)
+        path = os.path.join(self.tmp, 'jobs.csv')
+
+        def run():
+            self.jobinja.jobs = records
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.jobinja.save_to_csv(path)
+        return run
+
+    def bench_csv_stream(self, n):
+        records = cycle(self.records, n)
+        prefix = os.path.join(self.tmp, 'stream')
+
+        def run():
+            for ext in ('.csv', '.jsonl', '.checkpoint.json'):
+                if os.path.exists(prefix + ext):
+                    os.remove(prefix + ext)
+            sink = RecordSink.at(prefix)
+            for i, record in enumerate(records):
+                sink.write('JobVision', str(i), record)
+            sink.close()
+        return run
+
+    def bench_xlsx(self, n):
+        records = cycle(self.records, n)
+        return lambda: write_excel(records, os.path.join(self.tmp, 'jobs.xlsx'))
+
+
+BENCHES = [name[len('bench_'):] for name in vars(Suite) if name.startswith('bench_')]
+# benchmark -> fields its records must have filled in (not 'N/A' / empty)
+REQUIRED_FIELDS = {
+    'parse_jobinja_card': ('title', 'company', 'link'),
+    'get_job_details': ('requirements',),
+    'scrape_job_details': ('title', 'company', 'requirements'),
+}
+
+
+def check_output(name, output):
+    """'' when a benchmark's output looks like real extraction, else what is wrong with it"""
+    if name == 'dedup':
+        return '' if output else 'no job links found'
+    fields = REQUIRED_FIELDS.get(name)
+    if not fields:
+        return ''
+    records = [r for r in output or [] if r]
+    if not records:
+        return 'no records extracted'
+    problems = []
+    for field in fields:
+        filled = sum(1 for r in records if r.get(field) not in (None, '', 'N/A'))
+        if filled < MIN_FILLED * len(records):
+            problems.append(f"{field} {filled}/{len(records)}")
+    return ('fields missing: ' + ', '.join(problems)) if problems else ''
+
+
+def measure(suite, name, n, repeat):
+    """(best seconds, peak bytes, output problem) for one benchmark at one size"""
+    make = getattr(suite, 'bench_' + name)
+    best = float('inf')
+    for _ in range(repeat):
+        run = make(n)
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    run = make(n)
+    tracemalloc.start()
+    output = run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak, check_output(name, output)
+
+
+def compare(result, baseline, tolerance):
+    """Change against the baseline entry as text, and whether it is a regression"""
+    if not baseline:
+        return '', False
+    speed = result['items_per_s'] / baseline['items_per_s'] if baseline['items_per_s'] else 0
+    memory = result['peak_mb'] / baseline['peak_mb'] if baseline['peak_mb'] else 1
+    regressed = speed < 1 - tolerance or memory > 1 + tolerance
+    return f"{speed:5.2f}x speed {memory:5.2f}x mem" + ("  ⚠️ REGRESSION" if regressed else ""), regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='50,200', help='corpus sizes (items per run), comma separated')
+    parser.add_argument('--only', default='', help=f"benchmarks to run, from: {', '.join(BENCHES)}")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--parser', default='auto', help="html.parser, lxml or auto")
+    parser.add_argument('--fixtures', default=FIXTURES)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline JSON to compare against')
+    parser.add_argument('--save-baseline', metavar='PATH', help='write this run as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed slowdown / memory growth (0.2 = 20%%)')
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+    names = [n.strip() for n in args.only.split(',') if n.strip()] or BENCHES
+    unknown = set(names) - set(BENCHES)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    corpus, origin = load_corpus(args.fixtures)
+    print("Corpus: " + ", ".join(f"{kind} {origin[kind]}" for kind in KINDS))
+    suite = Suite(corpus, args.parser)
+    baseline = {}
+    if args.baseline and os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = {(r['bench'], r['size']): r for r in json.load(f)['results']}
+        print(f"Baseline: {args.baseline}")
+    print(f"best of {args.repeat}, parser={args.parser}\n")
+    print(f"{'benchmark':22} {'size':>6} {'items/s':>10} {'ms/item':>9} {'peak MB':>8}  vs baseline")
+
+    results = []
+    regressions = 0
+    for name in names:
+        for n in sizes:
+            seconds, peak, problem = measure(suite, name, n, args.repeat)
+            result = {'bench': name, 'size': n, 'seconds': round(seconds, 6),
+                      'items_per_s': round(n / seconds, 2) if seconds else 0.0,
+                      'peak_mb': round(peak / (1024 * 1024), 3)}
+            change, regressed = compare(result, baseline.get((name, n)), args.tolerance)
+            if problem:
+                # fast because it extracted nothing is not fast
+                change += f"  ❌ BROKEN EXTRACTION ({problem})"
+                regressed = True
+            regressions += regressed
+            results.append(result)
+            print(f"{name:22} {n:6} {result['items_per_s']:10.1f} {seconds * 1000 / n:9.3f} "
+                  f"{result['peak_mb']:8.2f}  {change}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump({'parser': args.parser, 'repeat': args.repeat, 'results': results}, f, indent=2)
+        print(f"\nBaseline saved to {args.save_baseline}")
+    if regressions:
+        print(f"\n{regressions} result(s) with broken extraction or worse than the baseline "
+              f"by more than {args.tolerance:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
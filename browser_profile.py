@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+Lean browser profile - Chrome only loads what the scrapers read. Images,
+fonts, media, analytics and ads are blocked (through CDP
+Network.setBlockedURLs, so it can change per navigation), pages load with
+the 'eager' strategy and every navigation gets a timeout for its page type.
+Pages that need full rendering (login, captcha) are navigated with nothing
+blocked. Bytes transferred and load time are collected per page type from
+Chrome's performance log.
+"""
+
+import re
+import threading
+import time
+from collections import defaultdict
+
+from selenium.common.exceptions import TimeoutException
+
+# resource type -> URL patterns that identify it (setBlockedURLs only matches URLs)
+TYPE_PATTERNS = {
+    'image': ['*.png*', '*.jpg*', '*.jpeg*', '*.gif*', '*.webp*', '*.svg*', '*.ico*'],
+    'font': ['*.woff*', '*.woff2*', '*.ttf*', '*.otf*', '*.eot*'],
+    'media': ['*.mp4*', '*.webm*', '*.mp3*', '*.ogg*'],
+    'stylesheet': ['*.css*'],
+}
+DEFAULT_BLOCK_TYPES = ('image', 'font', 'media')
+# analytics, ads, chat widgets and other third parties that never hold job data
+DEFAULT_BLOCK_PATTERNS = [
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*', '*googlesyndication.com*',
+    '*google.com/ads*', '*facebook.net*', '*hotjar.com*', '*clarity.ms*', '*yektanet.com*',
+    '*mediaad.org*', '*sentry.io*', '*najva.com*', '*raychat.io*', '*goftino.com*', '*cdn.jsdelivr.net/npm/@sentry*',
+]
+# page types loaded with everything (the captcha widget needs its images and styles)
+FULL_RENDER_TYPES = ('login',)
+FULL_RENDER_URLS = [r'account\.jobvision\.ir', r'/login']
+PAGE_TIMEOUTS = {'login': 60, 'search': 30, 'listing': 30, 'detail': 20}
+
+
+class ResourcePolicy:
+    def __init__(self, block_types=DEFAULT_BLOCK_TYPES, block_patterns=DEFAULT_BLOCK_PATTERNS,
+                 full_render_types=FULL_RENDER_TYPES, full_render_urls=FULL_RENDER_URLS,
+                 timeouts=PAGE_TIMEOUTS, default_timeout=30):
+        """Block `block_types` and URLs matching `block_patterns` except on full-render pages"""
+        self.blocked = [p for t in block_types for p in TYPE_PATTERNS[t]] + list(block_patterns)
+        self.full_render_types = full_render_types
+        self.full_render_urls = re.compile('|'.join(full_render_urls)) if full_render_urls else None
+        self.timeouts = timeouts
+        self.default_timeout = default_timeout
+        self.lock = threading.Lock()
+        self.stats = defaultdict(lambda: {'pages': 0, 'bytes': 0, 'blocked': 0, 'seconds': 0.0, 'timeouts': 0})
+        self._current = {}   # id(driver) -> blocking currently applied
+
+    def configure(self, chrome_options):
+        """Chrome options for a lean profile - call before the driver is created"""
+        chrome_options.page_load_strategy = 'eager'   # return at DOMContentLoaded, not after every image
+        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        return chrome_options
+
+    def attach(self, driver):
+        """Turn on CDP request blocking for a new driver"""
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+        except Exception as e:
+            print("Resource blocking unavailable:", str(e)[:150])
+        self._set_blocking(driver, True)
+
+    def _set_blocking(self, driver, block):
+        if self._current.get(id(driver)) == block:
+            return
+        try:
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.blocked if block else []})
+            self._current[id(driver)] = block
+        except Exception:
+            pass
+
+    def full_render(self, url, page_type):
+        return page_type in self.full_render_types or bool(
+            self.full_render_urls and self.full_render_urls.search(url))
+
+    def navigate(self, driver, url, page_type='detail'):
+        """driver.get with this page type's blocking and timeout; a timed-out load is stopped, not fatal
+
+        Returns (bytes transferred, timed out).
+        """
+        self._set_blocking(driver, not self.full_render(url, page_type))
+        try:
+            driver.set_page_load_timeout(self.timeouts.get(page_type, self.default_timeout))
+        except Exception:
+            pass
+        self._drain(driver)   # requests from the previous page are not this one's
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            driver.get(url)
+        except TimeoutException:
+            timed_out = True
+            try:
+                driver.execute_script("window.stop();")
+            except Exception:
+                pass
+        elapsed = time.perf_counter() - start
+        transferred, blocked = self._drain(driver)
+        with self.lock:
+            entry = self.stats[page_type]
+            entry['pages'] += 1
+            entry['bytes'] += transferred
+            entry['blocked'] += blocked
+            entry['seconds'] += elapsed
+            entry['timeouts'] += timed_out
+        return transferred, timed_out
+
+    def _drain(self, driver):
+        """(bytes received, requests blocked) from the performance log entries since the last call"""
+        transferred = blocked = 0
+        try:
+            entries = driver.get_log('performance')
+        except Exception:
+            return 0, 0
+        for entry in entries:
+            message = entry.get('message', '')
+            if '"Network.loadingFinished"' in message:
+                match = re.search(r'"encodedDataLength":\s*([\d.]+)', message)
+                if match:
+                    transferred += int(float(match.group(1)))
+            elif '"Network.loadingFailed"' in message and '"blockedReason"' in message:
+                blocked += 1
+        return transferred, blocked
+
+    def report(self):
+        """Print and return bytes transferred and load time per page type"""
+        with self.lock:
+            stats = {page_type: dict(entry) for page_type, entry in self.stats.items()}
+        if not stats:
+            return stats
+        print("🌐 Browser traffic per page type:")
+        for page_type, entry in sorted(stats.items()):
+            pages = entry['pages'] or 1
+            print(f"   {page_type:8} {entry['pages']:4} pages  {entry['bytes'] / pages / 1024:8.1f} KB/page  "
+                  f"{entry['seconds'] / pages:6.2f} s/page  {entry['blocked']} requests blocked"
+                  + (f"  {entry['timeouts']} timed out" if entry['timeouts'] else ""))
+        return stats
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Concurrent detail-page enrichment - fetches many job pages at once with a
+per-host concurrency cap and a token-bucket rate limit.
+
+Run `python enrich.py` to measure pages/second against a local HTTP server.
+"""
+
+import asyncio
+import time
+from urllib.parse import urlparse
+
+from rate_limit import RatePolicy
+
+
+class EnrichStats:
+    def __init__(self):
+        self.pages = 0
+        self.failures = 0
+        self.elapsed = 0.0
+        self.waited = 0.0
+
+    @property
+    def pages_per_second(self):
+        return self.pages / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        return (f"Enriched {self.pages} pages ({self.failures} failed) in {self.elapsed:.1f}s "
+                f"- {self.pages_per_second:.2f} pages/s, {self.waited:.1f}s rate-limited")
+
+
+class AsyncEnricher:
+    def __init__(self, worker, per_host_concurrency=4, rate=2.0, burst=4, rate_policy=None):
+        """worker(url) is a blocking callable (fetch + parse) run in a thread per page
+
+        per_host_concurrency caps in-flight requests per host. Requests are paced by
+        rate_policy (shared with the rest of the scraper), or by a per-host token
+        bucket of `rate`/`burst` when none is given.
+        """
+        self.worker = worker
+        self.per_host_concurrency = per_host_concurrency
+        self.rate_policy = rate_policy or RatePolicy(rate=rate, burst=burst)
+
+    async def _fetch_one(self, url, semaphores, stats):
+        host = urlparse(url).netloc
+        semaphore = semaphores.setdefault(host, asyncio.Semaphore(self.per_host_concurrency))
+        async with semaphore:
+            stats.waited += await self.rate_policy.pace_async(url)
+            try:
+                result = await asyncio.to_thread(self.worker, url)
+            except Exception as e:
+                print(f"   Enrichment failed for {url}: {str(e)[:150]}")
+                result = None
+        if result is None:
+            stats.failures += 1
+        else:
+            stats.pages += 1
+        return url, result
+
+    async def _run(self, urls, stats):
+        semaphores = {}
+        pairs = await asyncio.gather(*(self._fetch_one(url, semaphores, stats) for url in urls))
+        return dict(pairs)
+
+    def run(self, urls):
+        """Fetch every url concurrently; returns ({url: worker result or None}, EnrichStats)"""
+        stats = EnrichStats()
+        urls = list(dict.fromkeys(u for u in urls if u))
+        if not urls:
+            return {}, stats
+        start = time.perf_counter()
+        results = asyncio.run(self._run(urls, stats))
+        stats.elapsed = time.perf_counter() - start
+        return results, stats
+
+
+if __name__ == "__main__":
+    import argparse
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    from http_fetch import HttpFetcher
+
+    parser = argparse.ArgumentParser(description="Measure enrichment throughput against a local server")
+    parser.add_argument("--pages", type=int, default=60)
+    parser.add_argument("--latency", type=float, default=0.2, help="simulated server latency (s)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=10.0)
+    args = parser.parse_args()
+
+    class SlowHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(args.latency)
+            body = f"<html><body><div class='c-jobView'>{self.path}</div></body></html>".encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *a):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    fetcher = HttpFetcher(pool_size=args.concurrency)
+    enricher = AsyncEnricher(fetcher.fetch, per_host_concurrency=args.concurrency,
+                             rate=args.rate, burst=args.concurrency)
+    _, stats = enricher.run([f"{base}/jobs/{i}" for i in range(args.pages)])
+    print(stats)
+    print(f"Sequential estimate: {args.pages * args.latency:.1f}s")
+    server.shutdown()
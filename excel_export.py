@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Constant-memory Excel export - rows are streamed into a write-only openpyxl
+workbook, so neither the records nor the sheet are ever fully in memory.
+Widths and wrapping come from a per-column layout; the wrap style is built
+once per column instead of being looked up and assigned cell by cell.
+
+    python excel_export.py jobvision_stream.jsonl jobvision_jobs.xlsx
+"""
+
+import itertools
+import json
+import os
+import sys
+
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment
+from openpyxl.utils import get_column_letter
+
+# column -> (width, wrap text)
+COLUMN_LAYOUT = [
+    ('date_added', 20, False),
+    ('title', 40, False),
+    ('company', 30, False),
+    ('location', 25, False),
+    ('requirements', 60, True),
+    ('salary', 25, False),
+    ('contract_type', 20, False),
+    ('working_hours', 30, False),
+    ('link', 50, False),
+    ('source', 15, False),
+]
+WRAP = Alignment(wrap_text=True, vertical='top')
+
+
+def read_jsonl(path, offset=0):
+    """Yield the records of a JSON-lines file (e.g. an output_sink stream) one at a time, from byte `offset` on"""
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def read_excel(path, sheet_name='Jobs'):
+    """Yield the rows of a workbook written by write_excel as dicts, one at a time"""
+    wb = load_workbook(path, read_only=True)
+    try:
+        ws = wb[sheet_name] if sheet_name in wb.sheetnames else wb.active
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None) or ()
+        for row in rows:
+            yield {column: ('' if value is None else value) for column, value in zip(header, row) if column}
+    finally:
+        wb.close()
+
+
+def write_excel(records, filename, sheet_name='Jobs', layout=COLUMN_LAYOUT, append=False):
+    """Stream records (any iterable of dicts) into an .xlsx file; returns the number of rows written
+
+    With append=True the rows already in `filename` are kept and the new ones
+    added after them (the file is rewritten, still one row at a time).
+    """
+    if append and os.path.exists(filename):
+        base, ext = os.path.splitext(filename)
+        tmp = base + '.tmp' + ext
+        count = write_excel(itertools.chain(read_excel(filename, sheet_name), records), tmp, sheet_name, layout)
+        os.replace(tmp, filename)
+        return count
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(sheet_name)
+    wrapped = []
+    for index, (column, width, wrap) in enumerate(layout, 1):
+        dimension = ws.column_dimensions[get_column_letter(index)]
+        dimension.width = width
+        if wrap:
+            wrapped.append(index - 1)
+    columns = [column for column, _, _ in layout]
+    ws.append(columns)
+
+    count = 0
+    for record in records:
+        row = [record.get(column, '') for column in columns]
+        for i in wrapped:
+            cell = WriteOnlyCell(ws, value=row[i])
+            cell.alignment = WRAP
+            row[i] = cell
+        ws.append(row)
+        count += 1
+    wb.save(filename)
+    return count
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("usage: python excel_export.py <records.jsonl> <output.xlsx>")
+        sys.exit(1)
+    rows = write_excel(read_jsonl(sys.argv[1]), sys.argv[2])
+    print(f"Saved {rows} jobs to {sys.argv[2]}")
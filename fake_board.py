@@ -0,0 +1,307 @@
+# -*- coding: utf-8 -*-
+"""
+Local stand-in for jobinja.ir and jobvision.ir - an HTTP server that serves
+synthetic pages (fake_pages.py), so whole runs can be load-tested without
+touching the real sites. One server answers for both boards:
+
+    /login/user                                  Jobinja login form
+    /jobs?filters[keywords][]=<kw>&page=<n>      Jobinja result page (li.c-jobListView__item cards)
+    /companies/<co>/jobs/<id>/<slug>             Jobinja posting (c-infoBox, s-jobDesc)
+    /account/Candidate                           JobVision login (Username, then Password)
+    /jobs/keyword/<kw>                           JobVision search page (/jobs/<id> anchors)
+    /jobs/<id>/<slug>                            JobVision posting (h1, /companies/ link, sections)
+    /companies/<id>/<slug>                       JobVision company page
+    /__stats                                     what the server has answered so far, as JSON
+
+Every keyword has `pages` result pages of `per_page` postings, drawn from a
+pool of `jobs` postings - different keywords overlap, as on the real sites.
+Each response is delayed by `latency` seconds (plus up to `jitter`), a share
+`error_rate` of them fail with a 503, and with `rate_limit` every client may
+send that many requests per second (bursts of `burst`) before it gets a 429
+with a Retry-After header.
+
+    python fake_board.py --port 8800 --jobs 5000 --pages 20 --latency 0.05 --error-rate 0.01 --rate-limit 50
+    JOBINJA_FETCH_MODE=http JOBINJA_BASE_URL=http://127.0.0.1:8800 python Jobinja_scraper.py
+    JOBVISION_BASE_URL=http://127.0.0.1:8800 JOBVISION_ACCOUNT_URL=http://127.0.0.1:8800/account python Jobvision_scraper.py
+
+With --drive the server also runs the Jobinja scraper against itself (http
+mode, no login, through scheduler.Scheduler) and reports postings per second:
+
+    python fake_board.py --jobs 20000 --pages 25 --drive 10 --keyword-concurrency 4 --detail-concurrency 16
+"""
+
+import argparse
+import functools
+import json
+import random
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import fake_pages
+
+JOBINJA_LOGIN = ('<html dir="rtl"><body><form method="post" action="/login/user">'
+                 '<input type="text" name="identifier"><input type="password" name="password">'
+                 '<input type="submit" value="وارد شوید"></form></body></html>')
+# the email step shows the password field, like the real two-step form
+JOBVISION_LOGIN = ('<html><body><form method="post" action="/account/Candidate">'
+                   '<input type="text" name="Username">'
+                   '<a class="btn btn-primary" href="#" onclick="document.getElementById(\'pw\').style.display=\'block\';'
+                   'this.remove();return false;">ادامه</a>'
+                   '<div id="pw" style="display:none"><input type="password" name="Password">'
+                   '<button class="btn btn-primary" type="submit">ورود</button></div></form></body></html>')
+HOME = '<html><body><h1>خوش آمدید</h1></body></html>'
+
+
+class ClientLimiter:
+    def __init__(self, rate, burst):
+        """Per-client token buckets that refuse instead of waiting (rate <= 0 = no limit)"""
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}   # client -> [tokens, updated]
+        self.lock = threading.Lock()
+
+    def retry_after(self, client):
+        """0 when the request may go through, else seconds until the client has a token again"""
+        if self.rate <= 0:
+            return 0.0
+        with self.lock:
+            now = time.monotonic()
+            tokens, updated = self.buckets.get(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                self.buckets[client] = (tokens - 1, now)
+                return 0.0
+            self.buckets[client] = (tokens, now)
+            return (1 - tokens) / self.rate
+
+
+class FakeBoard:
+    def __init__(self, jobs=5000, pages=10, per_page=20, latency=0.0, jitter=0.0, error_rate=0.0,
+                 rate_limit=0.0, burst=5, seed=None):
+        """A board of `jobs` postings; see the module docstring for the knobs"""
+        self.jobs = jobs
+        self.pages = pages
+        self.per_page = per_page
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.limiter = ClientLimiter(rate_limit, burst)
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = Counter()   # (route, status) -> responses
+        self.bytes = 0
+        self.started = time.perf_counter()
+        self.server = None
+
+    def job_numbers(self, keyword, page):
+        """Posting numbers on one result page of a keyword ([] past the last page)"""
+        if page < 1 or page > self.pages:
+            return []
+        offset = zlib.crc32(keyword.encode('utf-8')) % self.jobs
+        first = offset + (page - 1) * self.per_page
+        return [(first + i) % self.jobs for i in range(self.per_page)]
+
+    def route(self, method, path, query):
+        """(route name, status, body, extra headers) for a request"""
+        parts = [unquote(p) for p in path.split('/') if p]
+        if path == '/__stats':
+            return 'stats', 200, json.dumps(self.stats(), ensure_ascii=False), {'Content-Type': 'application/json'}
+        if path == '/':
+            return 'home', 200, HOME, {}
+        if path == '/login/user':
+            if method == 'POST':
+                return 'login', 302, '', {'Location': '/', 'Set-Cookie': 'session=jobinja; Path=/'}
+            return 'login', 200, JOBINJA_LOGIN, {}
+        if path == '/account/Candidate':
+            if method == 'POST':
+                return 'login', 302, '', {'Location': '/', 'Set-Cookie': 'session=jobvision; Path=/'}
+            return 'login', 200, JOBVISION_LOGIN, {}
+        if parts == ['jobs']:
+            keyword = (query.get('filters[keywords][]') or [''])[0]
+            page = int((query.get('page') or ['1'])[0])
+            ids = [fake_pages.jobinja_job_ids(1, n)[0] for n in self.job_numbers(keyword, page)]
+            return 'jobinja_listing', 200, _page('jobinja_listing', tuple(ids)), {}
+        if len(parts) >= 4 and parts[0] == 'companies' and parts[2] == 'jobs':
+            return 'jobinja_detail', 200, _page('jobinja_detail', parts[3]), {}
+        if len(parts) >= 3 and parts[:2] == ['jobs', 'keyword']:
+            # the real page is a scrolling SPA - every result is on the one page here
+            numbers = [n for page in range(1, self.pages + 1) for n in self.job_numbers(parts[2], page)]
+            ids = [fake_pages.jobvision_job_ids(1, n)[0] for n in dict.fromkeys(numbers)]
+            return 'jobvision_search', 200, _page('jobvision_search', tuple(ids)), {}
+        if len(parts) >= 2 and parts[0] == 'jobs' and parts[1].isdigit():
+            return 'jobvision_detail', 200, _page('jobvision_detail', parts[1]), {}
+        if len(parts) >= 2 and parts[0] == 'companies':
+            return 'company', 200, f'<html><body><h1>شرکت {parts[1]}</h1></body></html>', {}
+        return 'other', 404, '<html><body>404</body></html>', {}
+
+    def respond(self, handler, method):
+        """Answer one request: rate limit, latency, injected errors, then the page"""
+        url = urlsplit(handler.path)
+        retry_after = self.limiter.retry_after(handler.client_address[0])
+        if retry_after:
+            name, status, body, headers = 'rate_limited', 429, 'Too Many Requests', {
+                'Retry-After': str(max(1, round(retry_after)))}
+        else:
+            delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+            if delay:
+                time.sleep(delay)
+            with self.lock:
+                failed = self.error_rate and self.random.random() < self.error_rate
+            if failed:
+                name, status, body, headers = 'error', 503, 'Service Unavailable', {}
+            else:
+                name, status, body, headers = self.route(method, url.path, parse_qs(url.query))
+        data = body.encode('utf-8')
+        handler.send_response(status)
+        handler.send_header('Content-Type', headers.pop('Content-Type', 'text/html; charset=utf-8'))
+        handler.send_header('Content-Length', str(len(data)))
+        for key, value in headers.items():
+            handler.send_header(key, value)
+        handler.end_headers()
+        if method != 'HEAD':
+            handler.wfile.write(data)
+        with self.lock:
+            self.counts[(name, status)] += 1
+            self.bytes += len(data)
+
+    def stats(self):
+        with self.lock:
+            counts = dict(self.counts)
+            sent = self.bytes
+        elapsed = time.perf_counter() - self.started
+        total = sum(counts.values())
+        return {
+            'seconds': round(elapsed, 3),
+            'requests': total,
+            'requests_per_s': round(total / elapsed, 2) if elapsed else 0.0,
+            'bytes': sent,
+            'by_route': {f"{name} {status}": n for (name, status), n in sorted(counts.items())},
+        }
+
+    def report(self):
+        stats = self.stats()
+        print(f"🖥️ Fake board: {stats['requests']} requests in {stats['seconds']:.1f}s "
+              f"({stats['requests_per_s']:.1f}/s), {stats['bytes'] / (1024 * 1024):.1f} MB sent")
+        for route, n in stats['by_route'].items():
+            print(f"   {route}: {n}")
+        return stats
+
+    def start(self, host='127.0.0.1', port=0):
+        """Serve in a background thread; returns the base URL"""
+        self.server = _Server((host, port), _Handler)
+        self.server.board = self
+        threading.Thread(target=self.server.serve_forever, name='fake-board', daemon=True).start()
+        return f"http://{host}:{self.server.server_address[1]}"
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+@functools.lru_cache(maxsize=512)
+def _page(kind, key):
+    """Pages depend only on their job IDs - build each one once"""
+    if kind == 'jobinja_listing':
+        return fake_pages.jobinja_listing_page(list(key))
+    if kind == 'jobinja_detail':
+        return fake_pages.jobinja_detail_page(key)
+    if kind == 'jobvision_search':
+        return fake_pages.jobvision_search_page(list(key))
+    return fake_pages.jobvision_detail_page(key)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256   # many scraper connections at once
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'   # keep-alive, like the real sites
+
+    def do_GET(self):
+        self.server.board.respond(self, 'GET')
+
+    def do_HEAD(self):
+        self.server.board.respond(self, 'HEAD')
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        self.server.board.respond(self, 'POST')
+
+    def log_message(self, format, *args):
+        pass   # thousands of requests - /__stats and the shutdown report summarise them
+
+
+def drive(base_url, board, keywords, keyword_concurrency, detail_concurrency, request_rate, max_jobs, cache_file):
+    """Run the Jobinja scraper over `keywords` synthetic keywords against the board; returns postings/s"""
+    from Jobinja_scraper import JobScraper
+    from scheduler import Scheduler
+    from sources import JobinjaSource
+
+    scraper = JobScraper(fetch_mode='http', session_file=None, base_url=base_url,
+                         detail_concurrency=detail_concurrency, max_pages=board.pages, cache_file=cache_file)
+    scheduler = Scheduler([JobinjaSource(scraper)], request_rate=request_rate, request_burst=detail_concurrency,
+                          jitter=0, keyword_concurrency=keyword_concurrency, max_jobs_per_keyword=None,
+                          max_jobs=max_jobs)
+    start = time.perf_counter()
+    try:
+        counts = scheduler.run([f"keyword {i}" for i in range(keywords)], start=False)
+    finally:
+        scheduler.close()
+    elapsed = time.perf_counter() - start
+    jobs = counts['Jobinja']['jobs']
+    print(f"\n🏁 {jobs} postings in {elapsed:.1f}s - {jobs / elapsed if elapsed else 0:.1f} postings/s")
+    return jobs / elapsed if elapsed else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8800)
+    parser.add_argument('--jobs', type=int, default=5000, help='postings on the board')
+    parser.add_argument('--pages', type=int, default=10, help='result pages per keyword')
+    parser.add_argument('--per-page', type=int, default=20, help='postings per result page')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='up to this many more seconds, at random')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of responses that fail with 503')
+    parser.add_argument('--rate-limit', type=float, default=0.0, help='requests/s per client before 429 (0 = off)')
+    parser.add_argument('--burst', type=int, default=5, help='requests a client may send at once')
+    parser.add_argument('--seed', type=int, default=None, help='seed for latency jitter and errors')
+    parser.add_argument('--drive', type=int, default=0, metavar='KEYWORDS',
+                        help='run the Jobinja scraper against the board over this many keywords, then exit')
+    parser.add_argument('--keyword-concurrency', type=int, default=4)
+    parser.add_argument('--detail-concurrency', type=int, default=8)
+    parser.add_argument('--request-rate', type=float, default=100.0, help='scraper pacing, requests/s')
+    parser.add_argument('--max-jobs', type=int, default=None)
+    parser.add_argument('--cache', default=None, help='page cache file for the driven scraper')
+    args = parser.parse_args()
+
+    board = FakeBoard(jobs=args.jobs, pages=args.pages, per_page=args.per_page, latency=args.latency,
+                      jitter=args.jitter, error_rate=args.error_rate, rate_limit=args.rate_limit,
+                      burst=args.burst, seed=args.seed)
+    base_url = board.start(args.host, args.port)
+    print(f"🖥️ Fake job board on {base_url} ({args.jobs} postings, {args.pages} x {args.per_page} per keyword)")
+    try:
+        if args.drive:
+            drive(base_url, board, args.drive, args.keyword_concurrency, args.detail_concurrency,
+                  args.request_rate, args.max_jobs, args.cache)
+        else:
+            print(f"   JOBINJA_BASE_URL={base_url} JOBVISION_BASE_URL={base_url} "
+                  f"JOBVISION_ACCOUNT_URL={base_url}/account  (Ctrl+C to stop)")
+            while True:
+                time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        board.stop()
+        board.report()
+
+
+if __name__ == '__main__':
+    main()
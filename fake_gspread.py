@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+In-memory stand-in for the parts of gspread the scrapers use, so Sheets
+batching and call counts can be checked offline. The fake can also play
+the API's rate limit: after `quota` calls it answers with a 429 (and a
+Retry-After header) once, then lets calls through again.
+"""
+
+import re
+from collections import Counter
+
+from gspread.exceptions import APIError, SpreadsheetNotFound
+
+
+class FakeResponse:
+    def __init__(self, status_code, message, retry_after=None):
+        self.status_code = status_code
+        self.text = message
+        self.headers = {'Retry-After': str(retry_after)} if retry_after is not None else {}
+
+    def json(self):
+        return {'error': {'code': self.status_code, 'message': self.text, 'status': 'RESOURCE_EXHAUSTED'}}
+
+
+def _column_index(letters):
+    index = 0
+    for ch in letters:
+        index = index * 26 + ord(ch.upper()) - ord('A') + 1
+    return index
+
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet, quota=None):
+        self.spreadsheet = spreadsheet
+        self.id = 0
+        self.rows = []
+        self.calls = Counter()
+        self.quota = quota
+        self.since_limit = 0
+
+    def _count(self, method):
+        self.calls[method] += 1
+        if self.quota is not None:
+            self.since_limit += 1
+            if self.since_limit > self.quota:
+                self.since_limit = 0
+                raise APIError(FakeResponse(429, 'Quota exceeded', retry_after=1))
+
+    def append_row(self, values, **kwargs):
+        self._count('append_row')
+        self.rows.append([str(v) for v in values])
+
+    def append_rows(self, values, **kwargs):
+        self._count('append_rows')
+        self.rows.extend([str(v) for v in row] for row in values)
+
+    def col_values(self, col):
+        self._count('col_values')
+        return [row[col - 1] if len(row) >= col else '' for row in self.rows]
+
+    def get(self, range_name=None, **kwargs):
+        """Supports single-column ranges like 'I5:I' and 'I5:I9'"""
+        self._count('get')
+        match = re.fullmatch(r'([A-Z]+)(\d+):([A-Z]+)(\d*)', range_name or '')
+        if not match:
+            return [list(row) for row in self.rows]
+        col = _column_index(match.group(1)) - 1
+        start = int(match.group(2)) - 1
+        end = int(match.group(4)) if match.group(4) else len(self.rows)
+        return [[row[col]] if len(row) > col else [] for row in self.rows[start:end]]
+
+    def update(self, values, range_name='A1', **kwargs):
+        self._count('update')
+        start = int(re.sub(r'[A-Z]+', '', range_name) or 1) - 1
+        while len(self.rows) < start + len(values):
+            self.rows.append([])
+        for offset, row in enumerate(values):
+            self.rows[start + offset] = [str(v) for v in row]
+
+
+class FakeSpreadsheet:
+    def __init__(self, title, quota=None):
+        self.title = title
+        self.id = f"fake-{title}"
+        self.sheet1 = FakeWorksheet(self, quota)
+
+
+class FakeClient:
+    def __init__(self, quota=None):
+        """quota: calls per worksheet before it answers with a 429 (None = unlimited)"""
+        self.quota = quota
+        self.spreadsheets = {}
+
+    def open(self, title):
+        if title not in self.spreadsheets:
+            raise SpreadsheetNotFound(title)
+        return self.spreadsheets[title]
+
+    def create(self, title):
+        self.spreadsheets[title] = FakeSpreadsheet(title, self.quota)
+        return self.spreadsheets[title]
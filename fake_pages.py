@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Synthetic Jobinja and JobVision pages with the structure the scrapers read:
+Jobinja result pages (li.c-jobListView__item cards) and posting pages
+(c-infoBox, s-jobDesc), JobVision search pages (/jobs/<id> anchors) and
+posting pages (h1, /companies/ link, section headers). Every page is
+generated from its job ID, so the same ID always gives the same page.
+Used by the offline benchmarks when no saved pages are at hand.
+"""
+
+import random
+
+CITIES = ['تهران', 'اصفهان', 'مشهد', 'شیراز', 'کرج']
+DISTRICTS = ['ونک', 'جردن', 'سعادت آباد', 'مرکز شهر', 'شهرک غرب']
+TITLES = ['Machine Learning Engineer', 'کارشناس هوش مصنوعی', 'Data Scientist', 'Deep Learning Researcher',
+          'برنامه‌نویس پایتون', 'MLOps Engineer', 'تحلیلگر داده', 'Computer Vision Engineer']
+COMPANIES = ['داده‌پردازان نوین', 'Hamrah Tech', 'فناوری ابری پارس', 'Sepehr AI', 'نوآوران داده']
+CONTRACTS = ['تمام‌وقت', 'پاره‌وقت', 'دورکاری', 'پروژه‌ای']
+SALARIES = ['{0} - {1} میلیون تومان', 'توافقی', 'حقوق: {0} - {1}']
+LOREM = ('تجربه کار با پایتون و کتابخانه‌های یادگیری ماشین، آشنایی با PyTorch و TensorFlow، '
+         'توانایی کار تیمی و حل مسئله، آشنایی با SQL و ابزارهای پردازش داده. ')
+
+
+def _rng(job_id):
+    return random.Random(str(job_id))
+
+
+def _filler(rng, kb):
+    """Navigation/footer markup with no job data, about `kb` kilobytes"""
+    links = ''.join(f'<li><a href="/category/{rng.randint(1, 999)}">دسته‌بندی {i}</a></li>' for i in range(40))
+    block = f'<nav class="c-menu"><ul>{links}</ul></nav><div class="c-footer"><p>{LOREM * 3}</p></div>'
+    return block * max(1, int(kb * 1024 / len(block.encode('utf-8'))))
+
+
+def jobinja_job_ids(count, start=0):
+    return [f"J{n:05d}" for n in range(start, start + count)]
+
+
+def jobinja_card(job_id):
+    rng = _rng(job_id)
+    title = rng.choice(TITLES)
+    return (f'<li class="c-jobListView__item"><div class="c-jobListView__titleLink">'
+            f'<h2 class="o-listView__itemTitle"><a class="c-jobListView__titleLink" '
+            f'href="/companies/co-{rng.randint(1, 99)}/jobs/{job_id}/{title.replace(" ", "-")}?_ref=16">'
+            f'{title} <span>({rng.randint(1, 9)} روز پیش)</span></a></h2></div>'
+            f'<ul class="o-listView__itemComplementInfo">'
+            f'<li class="c-jobListView__metaItem"><span>{rng.choice(COMPANIES)}</span></li>'
+            f'<li class="c-jobListView__metaItem"><span>{rng.choice(CITIES)} ، {rng.choice(DISTRICTS)}</span></li>'
+            f'<li class="c-jobListView__metaItem"><span>قرارداد {rng.choice(CONTRACTS)}</span></li></ul>'
+            f'<div class="c-jobListView__company">{rng.choice(COMPANIES)}</div></li>')
+
+
+def jobinja_listing_page(job_ids, filler_kb=40):
+    rng = _rng(''.join(job_ids[:1]))
+    cards = ''.join(jobinja_card(job_id) for job_id in job_ids)
+    return (f'<html dir="rtl"><head><title>جابینجا</title></head><body>{_filler(rng, filler_kb / 2)}'
+            f'<ul class="c-jobListView__list">{cards}</ul>{_filler(rng, filler_kb / 2)}</body></html>')
+
+
+def jobinja_detail_page(job_id, filler_kb=60):
+    rng = _rng(job_id)
+    low = rng.randint(10, 40)
+    salary = rng.choice(SALARIES).format(low, low + rng.randint(5, 20))
+    boxes = [('دسته‌بندی شغلی', 'هوش مصنوعی'), ('موقعیت مکانی', rng.choice(CITIES)),
+             ('نوع همکاری', rng.choice(CONTRACTS)), ('حقوق', salary),
+             ('ساعت کاری', f'شنبه تا چهارشنبه از ساعت {rng.randint(7, 10)}:00 تا {rng.randint(16, 19)}:00')]
+    info = ''.join(f'<div class="c-infoBox"><span class="c-infoBox__label">{label}</span>'
+                   f'<span class="c-infoBox__value">{value}</span></div>' for label, value in boxes)
+    desc = LOREM * rng.randint(3, 12)
+    return (f'<html dir="rtl"><body>{_filler(rng, filler_kb / 2)}<div class="c-jobView">'
+            f'<h1 class="c-jobView__title">{rng.choice(TITLES)}</h1>{info}'
+            f'<div class="o-box__text s-jobDesc c-pr40p">{desc}</div></div>{_filler(rng, filler_kb / 2)}'
+            f'</body></html>')
+
+
+def jobvision_job_ids(count, start=0):
+    return [str(1_000_000 + n) for n in range(start, start + count)]
+
+
+def jobvision_search_page(job_ids, filler_kb=30):
+    """Result page: each posting linked twice (card + title) plus a few non-posting /jobs/ links"""
+    rng = _rng(''.join(job_ids[:1]))
+    anchors = []
+    for job_id in job_ids:
+        slug = rng.choice(TITLES).replace(' ', '-')
+        anchors.append(f'<a href="/jobs/{job_id}/{slug}?ref=search"><div class="job-card-title">{slug}</div></a>')
+        anchors.append(f'<a href="/jobs/{job_id}/{slug}">{slug}</a>')
+    anchors.append('<a href="/jobs/keyword">همه‌ی آگهی‌ها</a>')
+    return (f'<html><body>{_filler(rng, filler_kb)}<div class="results">{"".join(anchors)}</div>'
+            f'</body></html>')
+
+
+def jobvision_detail_page(job_id, filler_kb=120):
+    rng = _rng(job_id)
+    low = rng.randint(10, 40)
+    items = ''.join(f'<li>{LOREM[:rng.randint(40, 160)]}</li>' for _ in range(rng.randint(4, 10)))
+    return (f'<html><body>{_filler(rng, filler_kb / 2)}<div class="job-detail">'
+            f'<h1>{rng.choice(TITLES)}، {rng.choice(CITIES)} {rng.randint(1, 5)} روز پیش</h1>'
+            f'<a href="/companies/{rng.randint(100, 999)}/x">{rng.choice(COMPANIES)}</a>'
+            f'<div>{rng.choice(CITIES)} ، {rng.choice(DISTRICTS)}</div>'
+            f'<div>شنبه تا چهارشنبه از ساعت {rng.randint(7, 10)}:00 تا {rng.randint(16, 19)}:00</div>'
+            f'<div>{rng.choice(["تمام وقت", "پاره وقت", "قراردادی"])}</div>'
+            f'<div>{low} - {low + rng.randint(5, 20)} میلیون تومان</div>'
+            f'<h2>شاخص‌های کلیدی از نظر کارفرما</h2><div>سابقه کار مرتبط حداقل {rng.randint(1, 5)} سال</div>'
+            f'<div>مدرک تحصیلی کارشناسی مرتبط</div>'
+            f'<h2>شرح شغل و وظایف</h2><ul>{items}</ul><p>{LOREM}</p>'
+            f'<h2>شرایط احراز شغل</h2><ul>{items}</ul>'
+            f'</div>{_filler(rng, filler_kb / 2)}</body></html>')
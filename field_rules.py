@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+Data-driven field extraction - location, salary, working hours and
+contract type resolved with a single scan over a page's text.
+
+Every token pattern in the rule table has an "anchor": a literal string
+any match must contain (its literal prefix when it has one, e.g. 'تهران',
+otherwise the longest mandatory literal such as 'تومان'). All anchors are
+compiled into one plain literal alternation, which `re` scans in a single
+fast pass. Token regexes then only run where their anchor was found -
+at the anchor itself for prefix anchors - and only until each field is
+resolved, in rule order, exactly like the old chains of `if ... elif`.
+
+To add a city or a contract type, extend the lists below - the single
+scan does not get slower per rule the way one search per rule did.
+"""
+
+import re
+from collections import defaultdict
+
+CITIES = ['تهران', 'اصفهان', 'مشهد', 'شیراز', 'کرج']
+FALLBACK_CITIES = ['تهران', 'اصفهان', 'شیراز', 'مشهد', 'کرج', 'تبریز']
+
+FULL_TIME = [r'تمام‌وقت', r'تمام وقت']
+PART_TIME = [r'پاره‌وقت', r'پاره وقت']
+REMOTE = [r'دورکاری', r'(?i:remote)']
+PROJECT = [r'پروژه‌ای']
+CONTRACTUAL = [r'قراردادی']
+
+WORKING_HOURS_PATTERN = r'(شنبه\s+تا\s+\w+\s+از\s+ساعت\s+[\d:]+\s+تا\s+[\d:]+)'
+SALARY_PATTERNS = [
+    r'(\d+)\s*-\s*(\d+)\s*میلیون\s*تومان',
+    r'(\d{1,3}(?:[,،]\d{3})*)\s*تومان',
+    r'حقوق[:\s]+(\d+(?:\s*-\s*\d+)?)',
+]
+
+# field -> ordered rules; each rule is (token patterns, value template).
+# Templates are str.format()ed with the match's groups ({0} = whole match)
+# and {text} = the whole input. The first rule with a hit wins.
+FIELD_RULES = {
+    # JobVision posting pages (scrape_job_details)
+    'jobvision': {
+        'location': (
+            [([rf'({city})\s*،\s*([^\n،]+)'], '{1}، {2}') for city in CITIES]
+            + [([city], city) for city in FALLBACK_CITIES]
+        ),
+        'working_hours': [
+            ([WORKING_HOURS_PATTERN], '{1}'),
+            (FULL_TIME, 'تمام‌وقت'),
+            ([r'پاره‌وقت'], 'پاره‌وقت'),
+            (REMOTE, 'دورکاری'),
+        ],
+        'contract_type': [
+            (FULL_TIME, 'تمام وقت'),
+            (PART_TIME, 'پاره وقت'),
+            (PROJECT, 'پروژه‌ای'),
+            (CONTRACTUAL, 'قراردادی'),
+        ],
+        'salary': [([p], '{0}') for p in SALARY_PATTERNS] + [([r'توافقی'], 'توافقی')],
+    },
+    # Jobinja listing-card meta items (parse_jobinja_card) - one item is one field
+    'jobinja_card': {
+        'contract_type': [
+            (FULL_TIME, 'تمام‌وقت'),
+            (PART_TIME, 'پاره‌وقت'),
+            ([r'دورکاری'], 'دورکاری'),
+            (PROJECT, 'پروژه‌ای'),
+        ],
+        'location': [
+            ([r'تهران', r'،'], '{text}'),
+        ],
+    },
+}
+
+DEFAULTS = {
+    'location': 'N/A',
+    'working_hours': 'N/A',
+    'contract_type': 'N/A',
+    'salary': 'N/A',
+}
+
+
+def _literal_runs(pattern):
+    """Yield (offset, literal) runs of plain characters at the top level of a regex"""
+    run, start, depth, i = '', 0, 0, 0
+    while i < len(pattern):
+        ch = pattern[i]
+        literal = None
+        if ch == '\\':
+            nxt = pattern[i + 1:i + 2]
+            literal = None if nxt.isalnum() else nxt
+            i += 2
+        elif ch == '[':
+            # skip the whole character class
+            i = pattern.index(']', i + 2 if pattern[i + 1:i + 2] == ']' else i + 1) + 1
+        elif ch in '()':
+            depth += 1 if ch == '(' else -1
+            i += 1
+        elif ch in '.^$|':
+            i += 1
+        elif ch in '*+?{':
+            if ch != '+' and run:
+                # the previous character is optional, so it cannot be part of an anchor
+                run = run[:-1]
+            if ch == '{':
+                i = pattern.index('}', i) + 1
+            else:
+                i += 1
+            if run:
+                yield start, run
+            run = ''
+            continue
+        else:
+            literal = ch
+            i += 1
+        if literal is not None and depth == 0:
+            if not run:
+                start = i - 1
+            run += literal
+        else:
+            if run:
+                yield start, run
+            run = ''
+    if run:
+        yield start, run
+
+
+def anchor_for(pattern):
+    """(literal every match contains, whether matches start with it) - (None, False) if unknown"""
+    if '|' in pattern.replace('\\|', ''):
+        return None, False
+    # a capturing group around the start of the pattern does not change where it starts
+    body = pattern
+    while body.startswith('(') and not body.startswith('(?'):
+        body = body[1:]
+    runs = list(_literal_runs(body))
+    if runs and runs[0][0] == 0:
+        return runs[0][1], True
+    # longest mandatory literal somewhere in the pattern (groups may be optional - skipped)
+    top = [r for _, r in _literal_runs(pattern)]
+    if top:
+        return max(top, key=len), False
+    return None, False
+
+
+class FieldExtractor:
+    def __init__(self, rules, defaults=DEFAULTS):
+        """Compile a {field: [(tokens, template), ...]} table into a single-scan matcher"""
+        self.defaults = defaults
+        self.tokens = []          # distinct token patterns, in table order
+        self.compiled = []
+        self.anchors = []         # per token: (anchor literal or None, anchor is a prefix)
+        self.fields = {}          # field -> [(token indexes, template)]
+        index = {}
+        for field, field_rules in rules.items():
+            resolved = []
+            for patterns, template in field_rules:
+                ids = []
+                for pattern in patterns:
+                    if pattern not in index:
+                        index[pattern] = len(self.tokens)
+                        self.tokens.append(pattern)
+                        self.compiled.append(re.compile(pattern))
+                        self.anchors.append(anchor_for(pattern))
+                    ids.append(index[pattern])
+                resolved.append((ids, template))
+            self.fields[field] = resolved
+        literals = sorted({a for a, _ in self.anchors if a}, key=len, reverse=True)
+        # plain literals only: no groups or classes, so `re` can use its fast literal scan
+        self.pattern = re.compile('|'.join(re.escape(a) for a in literals)) if literals else None
+
+    def scan(self, text):
+        """The single pass over text: {anchor: [positions]}"""
+        positions = defaultdict(list)
+        if self.pattern is not None:
+            for hit in self.pattern.finditer(text):
+                positions[hit.group()].append(hit.start())
+        return positions
+
+    def _match(self, token, text, positions, cache):
+        """Leftmost match of a token (None if absent), using the anchor positions from scan()"""
+        if token in cache:
+            return cache[token]
+        anchor, is_prefix = self.anchors[token]
+        match = None
+        if anchor is None:
+            match = self.compiled[token].search(text)
+        elif anchor in positions:
+            if is_prefix:
+                for position in positions[anchor]:
+                    match = self.compiled[token].match(text, position)
+                    if match:
+                        break
+            else:
+                match = self.compiled[token].search(text)
+        cache[token] = match
+        return match
+
+    def _resolve(self, field, text, positions, cache):
+        for ids, template in self.fields[field]:
+            for token in ids:
+                match = self._match(token, text, positions, cache)
+                if match:
+                    return template.format(match.group(0), *match.groups(), text=text)
+        return None
+
+    def extract(self, text, fields=None):
+        """Resolve every field (or just `fields`) from a single scan of text"""
+        positions, cache = self.scan(text), {}
+        result = {}
+        for field in fields or self.fields:
+            value = self._resolve(field, text, positions, cache)
+            result[field] = value if value is not None else self.defaults.get(field, 'N/A')
+        return result
+
+    def classify(self, text):
+        """(field, value) of the first field in table order that matches text, or (None, None)"""
+        positions, cache = self.scan(text), {}
+        for field in self.fields:
+            value = self._resolve(field, text, positions, cache)
+            if value is not None:
+                return field, value
+        return None, None
+
+
+JOBVISION_FIELDS = FieldExtractor(FIELD_RULES['jobvision'])
+JOBINJA_CARD_FIELDS = FieldExtractor(FIELD_RULES['jobinja_card'])
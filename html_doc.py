@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Parse-once HTML documents with a selectable parser backend.
+
+Every page is parsed exactly once; the BeautifulSoup tree and the page's
+full text are built lazily and cached on the Document. Backends:
+'html.parser' (pure Python, always available), 'lxml' (C, much faster)
+and 'auto' (lxml when installed, otherwise html.parser).
+
+The two backends repair broken markup differently, so on malformed pages
+the extracted text can differ between them - with 'auto', installing lxml
+can change results. Set SCRAPER_HTML_PARSER (or html_parser=) to a
+concrete backend to keep output stable across machines.
+"""
+
+import os
+
+from bs4 import BeautifulSoup
+
+BACKENDS = ('html.parser', 'lxml')
+DEFAULT_BACKEND = os.environ.get('SCRAPER_HTML_PARSER', 'auto')
+
+_available = {}
+
+
+def backend_available(backend):
+    if backend not in _available:
+        try:
+            BeautifulSoup('<p></p>', backend)
+            _available[backend] = True
+        except Exception:
+            _available[backend] = False
+    return _available[backend]
+
+
+def resolve_backend(backend=None):
+    """Turn 'auto'/None into a concrete parser name that is installed"""
+    backend = backend or DEFAULT_BACKEND
+    if backend == 'auto':
+        return 'lxml' if backend_available('lxml') else 'html.parser'
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown HTML parser backend: {backend} (choose from {BACKENDS} or 'auto')")
+    if not backend_available(backend):
+        print(f"⚠️ HTML parser '{backend}' is not installed - using html.parser")
+        return 'html.parser'
+    return backend
+
+
+class Document:
+    def __init__(self, html, backend=None, metrics=None):
+        """Wrap a page's HTML; nothing is parsed until .soup or .text is used
+
+        Parsing is timed as the 'parse' phase of `metrics` (metrics.RunMetrics), if given.
+        """
+        self.html = html or ''
+        self.backend = resolve_backend(backend)
+        self.metrics = metrics
+        self._soup = None
+        self._text = {}
+
+    @property
+    def soup(self):
+        if self._soup is None:
+            if self.metrics is not None:
+                with self.metrics.phase('parse'):
+                    self._soup = BeautifulSoup(self.html, self.backend)
+            else:
+                self._soup = BeautifulSoup(self.html, self.backend)
+        return self._soup
+
+    def text(self, separator="\n"):
+        """Full visible text of the page (cached per separator)"""
+        if separator not in self._text:
+            self._text[separator] = self.soup.get_text(separator=separator)
+        return self._text[separator]
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Pooled HTTP fetcher - a keep-alive requests.Session that returns the same
+HTML Chrome would, for pages that don't need JavaScript to render.
+"""
+
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                      '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+
+
+class HttpFetcher:
+    def __init__(self, user_agent=DEFAULT_USER_AGENT, pool_size=10, timeout=15, retries=2, metrics=None):
+        """Create a session whose connections are pooled and kept alive between requests
+
+        With `metrics` (metrics.RunMetrics) pages, bytes, retries and failed
+        requests are counted.
+        """
+        self.timeout = timeout
+        self.metrics = metrics
+        # site -> headers taken over from a browser session; sent only to that site,
+        # so a fetcher shared between boards does not leak one board's Referer to another
+        self.site_headers = {}
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': user_agent,
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'fa-IR,fa;q=0.9,en-US;q=0.8,en;q=0.7',
+            'Connection': 'keep-alive',
+        })
+        # 429s are retried after the server's Retry-After, like the 5xx errors
+        retry = Retry(total=retries, backoff_factor=0.5,
+                      status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=frozenset(['GET']))
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def get(self, url):
+        """GET a url and return the raw response (any status), or None on network errors"""
+        try:
+            response = self.session.get(url, timeout=self.timeout, headers=self.site_headers.get(_site(url)))
+        except requests.RequestException as e:
+            print(f"   HTTP fetch failed for {url}: {str(e)[:150]}")
+            if self.metrics is not None:
+                self.metrics.inc('errors')
+            return None
+        if self.metrics is not None:
+            self._count(response)
+        # requests falls back to latin-1 when the server omits a charset
+        if not response.encoding or response.encoding.lower() == 'iso-8859-1':
+            response.encoding = 'utf-8'
+        return response
+
+    def _count(self, response):
+        self.metrics.inc('pages')
+        self.metrics.inc('bytes', len(response.content))
+        retries = getattr(getattr(response.raw, 'retries', None), 'history', ())
+        if retries:
+            self.metrics.inc('retries', len(retries))
+        if response.status_code >= 400:
+            self.metrics.inc('errors')
+
+    def fetch(self, url):
+        """GET a page and return its HTML, or None if the request failed"""
+        response = self.get(url)
+        if response is None:
+            return None
+        if response.status_code != 200:
+            print(f"   HTTP {response.status_code} for {url}")
+            return None
+        return response.text
+
+    def load_cookies(self, cookies):
+        """Copy cookies (as returned by driver.get_cookies()) into the session"""
+        for cookie in cookies:
+            self.session.cookies.set(cookie['name'], cookie['value'],
+                                     domain=cookie.get('domain'), path=cookie.get('path', '/'))
+
+    def import_browser_session(self, driver):
+        """Take over a logged-in Selenium session: its cookies, and its User-Agent/language/Referer
+        headers for requests to the site the browser is on"""
+        self.load_cookies(driver.get_cookies())
+        headers = {}
+        try:
+            user_agent, languages = driver.execute_script(
+                "return [navigator.userAgent, (navigator.languages || []).join(',')];")
+            if user_agent:
+                headers['User-Agent'] = user_agent
+            if languages:
+                headers['Accept-Language'] = languages
+        except Exception:
+            pass
+        try:
+            headers['Referer'] = driver.current_url
+            self.site_headers[_site(driver.current_url)] = headers
+        except Exception:
+            pass
+
+    def close(self):
+        try:
+            self.session.close()
+        except Exception:
+            pass
+
+
+def _site(url):
+    """'jobvision.ir' for jobvision.ir and its subdomains; the host itself for IPs and single labels"""
+    host = (urlsplit(url).hostname or '').lower()
+    labels = host.split('.')
+    if len(labels) <= 2 or host.replace('.', '').isdigit():
+        return host
+    return '.'.join(labels[-2:])
+
+
+def needs_javascript(html, markers):
+    """True when the HTML is missing every marker we expect a rendered page to contain"""
+    if not html:
+        return True
+    if not markers:
+        return False
+    return not any(marker in html for marker in markers)
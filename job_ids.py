@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""
+URL normalisation and job IDs - the keys used to recognise the same posting
+across keywords, runs and sources.
+"""
+
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# query parameters that only track the visitor/referrer, never select content
+TRACKING_PARAMS = {'_ref', '_t', 'ref', 'fbclid', 'gclid', 'yclid', 'mc_cid', 'mc_eid'}
+
+JOBINJA_ID_RE = re.compile(r'/jobs/([A-Za-z0-9]+)(?:/|$)')
+JOBVISION_ID_RE = re.compile(r'/jobs/(\d+)')
+
+
+def normalize_url(url):
+    """Drop tracking parameters and the fragment, lowercase scheme/host, sort what is left"""
+    if not url:
+        return url
+    parts = urlsplit(url.strip())
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if k not in TRACKING_PARAMS and not k.startswith('utm_')]
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(sorted(query)), ''))
+
+
+def jobinja_job_id(url):
+    """'teCj' for .../companies/<co>/jobs/teCj/<slug>?_ref=..; the normalised URL if there is no ID"""
+    match = JOBINJA_ID_RE.search(urlsplit(url).path) if url else None
+    return match.group(1) if match else normalize_url(url)
+
+
+def jobvision_job_id(url):
+    """Numeric posting ID from a JobVision /jobs/<id>/... URL; the URL itself if there is none"""
+    match = JOBVISION_ID_RE.search(url) if url else None
+    return match.group(1) if match else url
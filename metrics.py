@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+Run metrics - where a run's time went and what it did. Phases (login,
+captcha, navigation, scroll, parse, extract, save, sleep) are timed and
+counters (pages, bytes, retries, errors) are kept per source and keyword.
+Phase times are exclusive: a captcha solved during login counts as captcha,
+not login, so the phases of one thread add up to at most its wall time.
+
+At the end of a run the numbers are written as Prometheus text (for a
+textfile collector or a pushgateway) and as a JSON run report:
+
+    METRICS_OUTPUT=run_metrics python Jobinja_scraper.py   # run_metrics.prom + run_metrics.json
+"""
+
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+PHASES = ('login', 'captcha', 'navigation', 'scroll', 'parse', 'extract', 'save', 'sleep')
+COUNTERS = ('pages', 'bytes', 'retries', 'errors')
+PREFIX = 'jobscraper'
+
+# labels and the enclosing phase follow the code that runs - asyncio.to_thread copies them,
+# thread pools get them through RunMetrics.bind
+_labels = contextvars.ContextVar('metric_labels', default=('', ''))
+_active = contextvars.ContextVar('metric_phase', default=None)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value):
+    """Exposition value without losing digits: whole numbers as ints, others at full float precision"""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def timed(phase):
+    """Method decorator: time each call as `phase` on self.metrics"""
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.metrics.phase(phase):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class RunMetrics:
+    def __init__(self, source=''):
+        """Empty metrics for a run starting now; `source` labels whatever is recorded outside labels()"""
+        self.source = source
+        self.started = datetime.now()
+        self._start = time.perf_counter()
+        self.phases = defaultdict(lambda: {'calls': 0, 'seconds': 0.0, 'max': 0.0})   # (phase, source, keyword)
+        self.counters = defaultdict(float)   # (counter, source, keyword)
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def labels(self, source=None, keyword=None):
+        """Attribute everything recorded inside the block to `source` / `keyword`"""
+        current_source, current_keyword = _labels.get()
+        token = _labels.set((source if source is not None else current_source,
+                             keyword if keyword is not None else current_keyword))
+        try:
+            yield
+        finally:
+            _labels.reset(token)
+
+    def bind(self, fn):
+        """Wrap fn so it records under the caller's labels when run on another thread"""
+        labels = _labels.get()
+
+        def bound(*args, **kwargs):
+            token = _labels.set(labels)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _labels.reset(token)
+        return bound
+
+    def _current_labels(self):
+        source, keyword = _labels.get()
+        return source or self.source, keyword
+
+    def _record(self, phase, seconds):
+        source, keyword = self._current_labels()
+        with self.lock:
+            entry = self.phases[(phase, source, keyword)]
+            entry['calls'] += 1
+            entry['seconds'] += seconds
+            entry['max'] = max(entry['max'], seconds)
+
+    @contextmanager
+    def phase(self, name):
+        """Time the block as phase `name` (minus any phases nested inside it)"""
+        frame = {'nested': 0.0}
+        parent = _active.get()
+        token = _active.set(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            _active.reset(token)
+            if parent is not None:
+                parent['nested'] += elapsed
+            self._record(name, max(0.0, elapsed - frame['nested']))
+
+    def observe(self, phase, seconds):
+        """Add time measured elsewhere (e.g. a sleep) to `phase`"""
+        parent = _active.get()
+        if parent is not None:
+            parent['nested'] += seconds
+        self._record(phase, seconds)
+
+    def inc(self, counter, value=1):
+        source, keyword = self._current_labels()
+        with self.lock:
+            self.counters[(counter, source, keyword)] += value
+
+    def totals(self):
+        """{'phases': {phase: seconds}, 'counters': {counter: value}} summed over sources and keywords"""
+        phases = defaultdict(float)
+        counters = defaultdict(float)
+        with self.lock:
+            for (phase, _, _), entry in self.phases.items():
+                phases[phase] += entry['seconds']
+            for (counter, _, _), value in self.counters.items():
+                counters[counter] += value
+        return {'phases': dict(phases), 'counters': dict(counters)}
+
+    def to_prometheus(self):
+        """Prometheus text exposition format"""
+        with self.lock:
+            phases = sorted(self.phases.items())
+            counters = sorted(self.counters.items())
+        lines = [
+            f'# HELP {PREFIX}_phase_seconds_total Time spent per phase (exclusive of nested phases).',
+            f'# TYPE {PREFIX}_phase_seconds_total counter',
+        ]
+        for (phase, source, keyword), entry in phases:
+            labels = f'phase="{_escape(phase)}",source="{_escape(source)}",keyword="{_escape(keyword)}"'
+            lines.append(f'{PREFIX}_phase_seconds_total{{{labels}}} {entry["seconds"]:.6f}')
+        lines += [
+            f'# HELP {PREFIX}_phase_calls_total Number of times each phase ran.',
+            f'# TYPE {PREFIX}_phase_calls_total counter',
+        ]
+        for (phase, source, keyword), entry in phases:
+            labels = f'phase="{_escape(phase)}",source="{_escape(source)}",keyword="{_escape(keyword)}"'
+            lines.append(f'{PREFIX}_phase_calls_total{{{labels}}} {entry["calls"]}')
+        for name in COUNTERS:
+            lines += [f'# HELP {PREFIX}_{name}_total {name.capitalize()} per source and keyword.',
+                      f'# TYPE {PREFIX}_{name}_total counter']
+            for (counter, source, keyword), value in counters:
+                if counter == name:
+                    lines.append(f'{PREFIX}_{name}_total{{source="{_escape(source)}",keyword="{_escape(keyword)}"}} '
+                                 f'{_number(value)}')
+        lines += [f'# HELP {PREFIX}_run_wall_seconds Wall time of the run so far.',
+                  f'# TYPE {PREFIX}_run_wall_seconds gauge',
+                  f'{PREFIX}_run_wall_seconds {time.perf_counter() - self._start:.3f}']
+        return '\n'.join(lines) + '\n'
+
+    def run_report(self):
+        """The JSON run report as a dict"""
+        with self.lock:
+            phases = [{'phase': phase, 'source': source, 'keyword': keyword, 'calls': entry['calls'],
+                       'seconds': round(entry['seconds'], 6), 'max_seconds': round(entry['max'], 6)}
+                      for (phase, source, keyword), entry in sorted(self.phases.items())]
+            counters = [{'counter': counter, 'source': source, 'keyword': keyword, 'value': value}
+                        for (counter, source, keyword), value in sorted(self.counters.items())]
+        return {
+            'started': self.started.strftime('%Y-%m-%d %H:%M:%S'),
+            'wall_seconds': round(time.perf_counter() - self._start, 3),
+            'totals': self.totals(),
+            'phases': phases,
+            'counters': counters,
+        }
+
+    def write(self, prefix):
+        """Write <prefix>.prom and <prefix>.json; returns their paths"""
+        paths = (prefix + '.prom', prefix + '.json')
+        for path, text in zip(paths, (self.to_prometheus(),
+                                      json.dumps(self.run_report(), ensure_ascii=False, indent=2))):
+            tmp = path + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp, path)   # a scraper of the .prom file never sees half a file
+        return paths
+
+    def report(self):
+        """Print where the run's time went, per phase"""
+        totals = self.totals()
+        if not totals['phases'] and not totals['counters']:
+            return totals
+        phases = ", ".join(f"{phase} {secs:.1f}s" for phase, secs in
+                           sorted(totals['phases'].items(), key=lambda kv: -kv[1]))
+        counters = ", ".join(f"{int(totals['counters'].get(name, 0))} {name}" for name in COUNTERS)
+        print(f"📈 Phases: {phases or 'none'}")
+        print(f"   {counters}")
+        return totals
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming output - records are appended to CSV and/or JSONL as soon as they
+are extracted (flushed in batches), and a checkpoint remembers which
+keywords and job IDs are done so a crashed run can resume where it stopped.
+"""
+
+import csv
+import json
+import os
+import threading
+
+COLUMNS = ['date_added', 'title', 'company', 'location', 'requirements',
+           'salary', 'contract_type', 'working_hours', 'link', 'source']
+
+
+class RecordSink:
+    def __init__(self, csv_path=None, jsonl_path=None, checkpoint_path=None,
+                 batch_size=10, columns=COLUMNS):
+        """Append records to csv_path/jsonl_path every batch_size records; progress goes to checkpoint_path"""
+        self.csv_path = csv_path
+        self.jsonl_path = jsonl_path
+        self.checkpoint_path = checkpoint_path
+        self.batch_size = batch_size
+        self.columns = columns
+        self.lock = threading.Lock()
+        self.buffer = []
+        self.pending_ids = []
+        self.written = 0
+        self.keywords = {}   # source -> keywords finished
+        self.job_ids = {}    # source -> job IDs written
+        self.jsonl_start = None   # size of jsonl_path when this run (or the run it resumes) started
+        self._csv = self._jsonl = self._writer = None
+        self.load_checkpoint()
+        if self.jsonl_start is None:
+            self.jsonl_start = os.path.getsize(jsonl_path) if jsonl_path and os.path.exists(jsonl_path) else 0
+
+    @classmethod
+    def at(cls, prefix, batch_size=10):
+        """Sink writing <prefix>.csv and <prefix>.jsonl, checkpointed in <prefix>.checkpoint.json"""
+        return cls(prefix + '.csv', prefix + '.jsonl', prefix + '.checkpoint.json', batch_size)
+
+    def load_checkpoint(self):
+        """Pick up the progress of a previous, unfinished run"""
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return False
+        try:
+            with open(self.checkpoint_path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        self.keywords = {s: set(k) for s, k in data.get('keywords', {}).items()}
+        self.job_ids = {s: set(ids) for s, ids in data.get('job_ids', {}).items()}
+        self.jsonl_start = data.get('jsonl_start')
+        done = sum(len(ids) for ids in self.job_ids.values())
+        print(f"♻️ Resuming from {self.checkpoint_path}: {done} jobs and "
+              f"{sum(len(k) for k in self.keywords.values())} keywords already done")
+        return True
+
+    def done_ids(self, source):
+        return set(self.job_ids.get(source, ()))
+
+    def keyword_done(self, source, keyword):
+        return keyword in self.keywords.get(source, ())
+
+    def all_done(self, source, keywords):
+        return all(self.keyword_done(source, k) for k in keywords)
+
+    def write(self, source, job_id, record):
+        """Queue one record; every batch_size records they are written and checkpointed"""
+        with self.lock:
+            self.buffer.append(record)
+            self.pending_ids.append((source, job_id))
+            if len(self.buffer) >= self.batch_size:
+                self._flush()
+
+    def finish_keyword(self, source, keyword):
+        """Flush what is buffered and record the keyword as done"""
+        with self.lock:
+            self.keywords.setdefault(source, set()).add(keyword)
+            self._flush()
+
+    def flush(self):
+        with self.lock:
+            self._flush()
+
+    def _open(self):
+        if self.csv_path and self._csv is None:
+            new = not os.path.exists(self.csv_path) or os.path.getsize(self.csv_path) == 0
+            self._csv = open(self.csv_path, 'a', encoding='utf-8-sig' if new else 'utf-8', newline='')
+            self._writer = csv.DictWriter(self._csv, fieldnames=self.columns, extrasaction='ignore')
+            if new:
+                self._writer.writeheader()
+        if self.jsonl_path and self._jsonl is None:
+            self._jsonl = open(self.jsonl_path, 'a', encoding='utf-8')
+
+    def _flush(self):
+        if self.buffer:
+            self._open()
+            if self._csv is not None:
+                self._writer.writerows(self.buffer)
+            if self._jsonl is not None:
+                self._jsonl.writelines(json.dumps(r, ensure_ascii=False) + '\n' for r in self.buffer)
+            for handle in (self._csv, self._jsonl):
+                if handle is not None:
+                    handle.flush()
+                    os.fsync(handle.fileno())
+            self.written += len(self.buffer)
+            for source, job_id in self.pending_ids:
+                self.job_ids.setdefault(source, set()).add(job_id)
+            self.buffer, self.pending_ids = [], []
+        # records are on disk before the checkpoint says they are done
+        self._save_checkpoint()
+
+    def _save_checkpoint(self):
+        if not self.checkpoint_path:
+            return
+        data = {
+            'keywords': {s: sorted(k) for s, k in self.keywords.items()},
+            'job_ids': {s: sorted(ids) for s, ids in self.job_ids.items()},
+            'jsonl_start': self.jsonl_start,
+        }
+        tmp = self.checkpoint_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp, self.checkpoint_path)
+
+    def finish(self):
+        """Run completed: flush, close the files and drop the checkpoint so the next run starts fresh"""
+        self.close()
+        if self.checkpoint_path:
+            try:
+                os.remove(self.checkpoint_path)
+            except OSError:
+                pass
+            self.checkpoint_path = None
+
+    def close(self):
+        """Flush and close the output files (the checkpoint is kept for resuming)"""
+        with self.lock:
+            self._flush()
+            for handle in (self._csv, self._jsonl):
+                if handle is not None:
+                    handle.close()
+            self._csv = self._jsonl = self._writer = None
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+Raw page archive - every page a run downloads is appended to a gzip'd
+JSON-lines file (url, source, kind, fetched_at, html), so extraction bugs
+can be fixed by re-parsing the archive instead of scraping again.
+
+    python page_archive.py reparse archive/pages.jsonl.gz --workers 8 --out reparsed.csv
+"""
+
+import argparse
+import gzip
+import itertools
+import json
+import os
+import threading
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from job_ids import normalize_url
+
+
+class PageArchive:
+    def __init__(self, path='archive/pages.jsonl.gz'):
+        """Append-only archive at `path`; each run adds a new gzip member to the same file"""
+        self.path = path
+        self.lock = threading.Lock()
+        self.count = 0
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.file = gzip.open(path, 'ab', compresslevel=6)
+
+    def add(self, url, source, html, kind='detail'):
+        """Append one page; flushed right away so a crash loses at most the page being written"""
+        if not html:
+            return
+        record = {'url': url, 'source': source, 'kind': kind, 'fetched_at': time.time(), 'html': html}
+        line = json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n'
+        with self.lock:
+            self.file.write(line)
+            self.file.flush()
+            self.count += 1
+
+    def close(self):
+        try:
+            self.file.close()
+        except Exception:
+            pass
+
+
+def read_archive(path):
+    """Yield the records of an archive, stopping quietly at a truncated tail"""
+    with gzip.open(path, 'rb') as f:
+        try:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+        except (EOFError, OSError, zlib.error):
+            print(f"{path}: archive ends with an incomplete record - stopped there")
+
+
+# ----- offline re-extraction (one scraper per worker process, no browser) -----
+_scrapers = {}
+
+
+def _init_worker(html_parser):
+    from Jobinja_scraper import JobScraper
+    from Jobvision_scraper import JobVisionScraper
+    _scrapers['Jobinja'] = JobScraper(fetch_mode='offline', session_file=None, html_parser=html_parser)
+    _scrapers['JobVision'] = JobVisionScraper('', '', fetch_mode='offline', session_file=None,
+                                              html_parser=html_parser)
+
+
+def _stamp(record):
+    return datetime.fromtimestamp(record['fetched_at']).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def reparse_record(record):
+    """Re-run extraction on one archived page: ('job', row), ('card', row) or ('detail', details)"""
+    from html_doc import Document
+    scraper = _scrapers[record['source']]
+    if record['source'] == 'JobVision':
+        if record['kind'] != 'detail':
+            return []
+        row = scraper.parse_job_details(record['html'], record['url'])
+        if row:
+            row['date_added'] = _stamp(record)
+        return [('job', row)] if row else []
+
+    soup = Document(record['html'], scraper.html_parser).soup
+    if record['kind'] == 'listing':
+        results = []
+        for card in soup.find_all('li', class_='c-jobListView__item'):
+            row = scraper.parse_jobinja_card(card, fetch_details=False)
+            if row:
+                row['date_added'] = _stamp(record)
+                results.append(('card', row))
+        return results
+    details = scraper.extract_job_details(soup)
+    details['link'] = normalize_url(record['url'])
+    return [('detail', details)]
+
+
+def reparse_batch(records):
+    return [reparse_record(record) for record in records]
+
+
+def reparse(paths, workers=None, html_parser='auto', chunksize=16):
+    """Re-extract job records from archives with a process pool; latest fetch of each posting wins
+
+    Pages go to the workers in batches of `chunksize`, with only a few batches
+    per worker in flight, so the archive is never read into memory as a whole.
+    """
+    jobs, cards, details = {}, {}, {}
+    pages = 0
+    start = time.perf_counter()
+    records = (record for path in paths for record in read_archive(path))
+    batches = iter(lambda: list(itertools.islice(records, chunksize)), [])
+    window = 4 * (workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(html_parser,)) as pool:
+        in_flight = deque(pool.submit(reparse_batch, batch) for batch in itertools.islice(batches, window))
+        while in_flight:
+            # results are taken in archive order - a later fetch of a posting overwrites an earlier one
+            batch_results = in_flight.popleft().result()
+            batch = next(batches, None)
+            if batch is not None:
+                in_flight.append(pool.submit(reparse_batch, batch))
+            for results in batch_results:
+                pages += 1
+                for kind, row in results:
+                    if kind == 'job':
+                        jobs[normalize_url(row['link'])] = row
+                    elif kind == 'card':
+                        cards[row['link']] = row
+                    else:
+                        details[row.pop('link')] = row
+    # a Jobinja record is its listing card plus whatever its detail page added
+    for link, row in cards.items():
+        row.update(details.get(link, {}))
+        jobs[link] = row
+    elapsed = time.perf_counter() - start
+    print(f"Re-parsed {pages} pages into {len(jobs)} jobs in {elapsed:.1f}s "
+          f"({pages / elapsed if elapsed else 0:.0f} pages/s)")
+    return list(jobs.values())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-extract job records from archived pages (no browser)")
+    parser.add_argument('command', choices=['reparse'])
+    parser.add_argument('archives', nargs='+')
+    parser.add_argument('--workers', type=int, default=None, help='processes (default: all cores)')
+    parser.add_argument('--parser', default='auto', help="html.parser, lxml or auto")
+    parser.add_argument('--out', default='reparsed_jobs.csv')
+    args = parser.parse_args()
+
+    import pandas as pd
+    rows = reparse(args.archives, workers=args.workers, html_parser=args.parser)
+    pd.DataFrame(rows).to_csv(args.out, index=False, encoding='utf-8-sig')
+    print(f"Saved {len(rows)} jobs to {args.out}")
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+On-disk page cache - fetched HTML (zlib-compressed) keyed by normalised URL,
+so a re-run within the TTL costs no network and no browser time. Entries
+expire after ttl_hours; the least recently used ones are evicted once the
+cache grows past max_mb.
+
+    python page_cache.py [stats|clear] [path]
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+
+from job_ids import normalize_url
+
+
+class PageCache:
+    def __init__(self, path='.cache/pages.sqlite', ttl_hours=24, max_mb=200):
+        """Cache file at `path`; entries older than ttl_hours are refetched"""
+        self.path = path
+        self.ttl = ttl_hours * 3600
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'stores': 0, 'evicted': 0}
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                html BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS pages_last_used ON pages (last_used)")
+        self.conn.commit()
+        # compressed bytes in the cache - summed once here, then kept up to date on put/delete/evict
+        self.total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+
+    def get(self, url):
+        """Cached HTML for url, or None if it is missing or older than the TTL"""
+        key = normalize_url(url)
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute("SELECT html, fetched_at, size FROM pages WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+            if now - row[1] > self.ttl:
+                self.conn.execute("DELETE FROM pages WHERE key = ?", (key,))
+                self.conn.commit()
+                self.total -= row[2]
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+                return None
+            self.conn.execute("UPDATE pages SET last_used = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+            self.stats['hits'] += 1
+        return zlib.decompress(row[0]).decode('utf-8')
+
+    def put(self, url, html):
+        """Store a freshly fetched page, then evict LRU entries beyond the size cap"""
+        if not html:
+            return
+        blob = zlib.compress(html.encode('utf-8'), 6)
+        now = time.time()
+        key = normalize_url(url)
+        with self.lock:
+            replaced = self.conn.execute("SELECT size FROM pages WHERE key = ?", (key,)).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pages (key, url, html, size, fetched_at, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, url, blob, len(blob), now, now))
+            self.total += len(blob) - (replaced[0] if replaced else 0)
+            self.stats['stores'] += 1
+            self._evict()
+            self.conn.commit()
+
+    def _evict(self):
+        if self.total <= self.max_bytes:
+            return
+        # oldest-used first, until the cache fits again
+        for key, size in self.conn.execute("SELECT key, size FROM pages ORDER BY last_used").fetchall():
+            if self.total <= self.max_bytes:
+                break
+            self.conn.execute("DELETE FROM pages WHERE key = ?", (key,))
+            self.total -= size
+            self.stats['evicted'] += 1
+
+    def size(self):
+        """(entries, compressed bytes) currently in the cache"""
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages").fetchone()
+
+    def hit_rate(self):
+        lookups = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / lookups if lookups else 0.0
+
+    def report(self):
+        """Print and return this run's hit/miss statistics"""
+        entries, size = self.size()
+        print(f"🗄️ Page cache: {self.stats['hits']} hits, {self.stats['misses']} misses "
+              f"({self.hit_rate():.0%} hit rate), {self.stats['expired']} expired, "
+              f"{self.stats['evicted']} evicted - {entries} pages, {size / 1024 / 1024:.1f} MB")
+        return dict(self.stats, entries=entries, bytes=size)
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM pages")
+            self.conn.commit()
+            self.total = 0
+
+    def close(self):
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else 'stats'
+    cache = PageCache(sys.argv[2]) if len(sys.argv) > 2 else PageCache()
+    if command == 'clear':
+        cache.clear()
+        print(f"Cleared {cache.path}")
+    else:
+        entries, size = cache.size()
+        print(f"{cache.path}: {entries} pages, {size / 1024 / 1024:.1f} MB compressed")
+    cache.close()
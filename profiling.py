@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+Profiling mode for the scraper entry points (`--profile[=prefix]`).
+
+A background thread samples the stacks of every thread and writes them in
+collapsed-stack form (<prefix>.folded - flamegraph.pl, speedscope and
+inferno read it). The scraper's stage methods (parse_jobinja_card,
+get_job_details, scrape_job_details, find_gap_position, the CSV/Excel/
+Sheets exports, ...) are wrapped to measure wall and CPU time per call, and
+samples taken inside a stage show how much of its wall time was spent
+blocked on WebDriver or on HTTP. The per-stage top-N table is printed and
+written to <prefix>.txt.
+
+    python Jobinja_scraper.py --profile
+    python Jobvision_scraper.py --profile=profile_jobvision
+"""
+
+import functools
+import inspect
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+
+JOBINJA_STAGES = ('auto_login', 'listing_pages', 'process_cards', 'parse_jobinja_card', 'get_job_details',
+                  'enrich_jobs', 'fetch_page', 'extract_job_details', 'scroll_page',
+                  'save_to_csv', 'save_to_google_sheets')
+JOBVISION_STAGES = ('login_to_jobvision', 'solve_arcaptcha', 'find_gap_position', 'search_links',
+                    'scrape_job_details', 'fetch_job_page', 'parse_job_details', 'scrape_details_pool',
+                    'save_to_excel')
+
+# a stack going through these is waiting on something outside the process
+BLOCKING = (('webdriver', os.sep + 'selenium' + os.sep), ('http', os.sep + 'requests' + os.sep),
+            ('http', os.sep + 'urllib3' + os.sep))
+# where idle threads (pool workers, servers) sit between tasks
+IDLE_FILES = ('threading.py', 'selectors.py', 'queue.py')
+
+
+def profile_arg(argv, default_prefix):
+    """Output prefix when argv has --profile or --profile=<prefix>, else None"""
+    for arg in argv[1:]:
+        if arg == '--profile':
+            return default_prefix
+        if arg.startswith('--profile='):
+            return arg.split('=', 1)[1] or default_prefix
+    return None
+
+
+class RunProfiler:
+    def __init__(self, prefix, interval=0.005, top=15):
+        """Sample every `interval` seconds; the tables show the `top` stages and functions"""
+        self.prefix = prefix
+        self.interval = interval
+        self.top = top
+        self.stacks = Counter()                # collapsed stack -> samples
+        self.leaves = Counter()                # leaf function -> samples
+        self.stage_samples = defaultdict(Counter)   # stage -> {'cpu'|'webdriver'|'http': samples}
+        self.stage_times = defaultdict(lambda: {'calls': 0, 'wall': 0.0, 'cpu': 0.0})
+        self.stage_codes = {}                  # code object -> stage name
+        self.lock = threading.Lock()
+        self._patched = []
+        self._stop = threading.Event()
+        self._thread = None
+        self._rounds = 0
+
+    def instrument(self, cls, names):
+        """Wrap cls.<name> for each stage so its calls are timed (wall and thread CPU)"""
+        for name in names:
+            method = cls.__dict__.get(name)
+            if method is None:
+                continue
+            self.stage_codes[inspect.unwrap(method).__code__] = name
+            setattr(cls, name, self._timed(name, method))
+            self._patched.append((cls, name, method))
+        return self
+
+    def _timed(self, name, method):
+        if inspect.isgeneratorfunction(inspect.unwrap(method)):
+            # a generator's body runs between yields - sampling covers it, per-call timing would not
+            return method
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            wall = time.perf_counter()
+            cpu = time.thread_time()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                with self.lock:
+                    entry = self.stage_times[name]
+                    entry['calls'] += 1
+                    entry['wall'] += time.perf_counter() - wall
+                    entry['cpu'] += time.thread_time() - cpu
+        return wrapper
+
+    def start(self):
+        self.started = time.perf_counter()
+        self.cpu_started = time.process_time()
+        self._thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop sampling, undo the stage wrappers and write the outputs; returns the table"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.wall = time.perf_counter() - self.started
+        self.cpu = time.process_time() - self.cpu_started
+        for cls, name, method in reversed(self._patched):
+            setattr(cls, name, method)
+        self._patched = []
+        return self.write()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident != own:
+                    self._sample(names.get(ident, str(ident)), frame)
+            self._rounds += 1
+
+    def _sample(self, thread_name, frame):
+        stack = []
+        stage = None
+        blocked = None
+        while frame is not None:
+            code = frame.f_code
+            if code.co_filename != __file__:   # the stage wrappers are not worth a flame
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            if stage is None and code in self.stage_codes:
+                stage = self.stage_codes[code]   # innermost stage wins
+            for kind, marker in BLOCKING:
+                if marker in code.co_filename:
+                    blocked = kind
+            frame = frame.f_back
+        # idle threads are left out
+        if not stack or (stage is None and stack[0].split(':')[0] in IDLE_FILES):
+            return
+        stack.append(thread_name)
+        self.stacks[';'.join(reversed(stack))] += 1
+        self.leaves[stack[0]] += 1
+        if stage is not None:
+            self.stage_samples[stage][blocked or 'cpu'] += 1
+
+    def table(self):
+        """The per-stage and hottest-function tables as text"""
+        tick = self.wall / self._rounds if self._rounds else self.interval
+        lines = [f"Wall {self.wall:.1f}s, process CPU {self.cpu:.1f}s "
+                 f"({self.cpu / self.wall * 100 if self.wall else 0:.0f}% of wall), "
+                 f"{sum(self.stacks.values())} samples every {tick * 1000:.1f} ms",
+                 "",
+                 f"{'stage':24} {'calls':>6} {'wall s':>8} {'cpu s':>8} {'webdriver s':>12} {'http s':>8}"]
+        stages = sorted(set(self.stage_times) | set(self.stage_samples),
+                        key=lambda s: -self.stage_times[s]['cpu'] if s in self.stage_times else 0)
+        for stage in stages[:self.top]:
+            times = self.stage_times.get(stage, {'calls': 0, 'wall': 0.0, 'cpu': 0.0})
+            samples = self.stage_samples.get(stage, Counter())
+            lines.append(f"{stage:24} {times['calls']:6} {times['wall']:8.2f} {times['cpu']:8.2f} "
+                         f"{samples['webdriver'] * tick:12.2f} {samples['http'] * tick:8.2f}")
+        lines += ["",
+                  "(wall/cpu include nested stages; webdriver/http are sampled wall time of the innermost stage)",
+                  "",
+                  f"{'hottest functions (sampled)':48} {'samples':>8} {'s':>8}"]
+        for leaf, count in self.leaves.most_common(self.top):
+            lines.append(f"{leaf[:48]:48} {count:8} {count * tick:8.2f}")
+        return '\n'.join(lines)
+
+    def write(self):
+        table = self.table()
+        with open(self.prefix + '.folded', 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        with open(self.prefix + '.txt', 'w', encoding='utf-8') as f:
+            f.write(table + '\n')
+        print("\n🔬 Profile\n" + table)
+        print(f"\nFlame graph input: {self.prefix}.folded (flamegraph.pl / speedscope), table: {self.prefix}.txt")
+        return table
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+Token-bucket rate limiting - replaces fixed random sleeps with a steady,
+configurable request rate toward each site. RatePolicy is the one place
+pacing is configured; WaitTracker reports how much of a run went to waiting.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity=1):
+        """Allow `rate` requests per second on average, with bursts of up to `capacity`"""
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _reserve(self):
+        """Take a token and return how many seconds the caller has to wait before using it"""
+        if not self.rate or self.rate <= 0:
+            return 0.0
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # tokens may go negative: later callers queue up behind earlier ones
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def acquire(self):
+        """Block until a request may be sent; returns the time spent waiting"""
+        wait = self._reserve()
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self):
+        """asyncio version of acquire()"""
+        wait = self._reserve()
+        if wait:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class WaitTracker:
+    def __init__(self, metrics=None):
+        """Accumulates wall time spent waiting, per reason, since creation
+
+        Deliberate pauses (sleeps and pacing) also go to `metrics`
+        (metrics.RunMetrics) as the 'sleep' phase.
+        """
+        self.started = time.perf_counter()
+        self.waited = defaultdict(float)
+        self.lock = threading.Lock()
+        self.metrics = metrics
+
+    def add(self, reason, seconds, deliberate=False):
+        with self.lock:
+            self.waited[reason] += seconds
+        if deliberate and self.metrics is not None:
+            self.metrics.observe('sleep', seconds)
+
+    @contextmanager
+    def waiting(self, reason):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(reason, time.perf_counter() - start)
+
+    def sleep(self, seconds, reason='sleep'):
+        """A deliberate, unconditional pause - use sparingly"""
+        time.sleep(seconds)
+        self.add(reason, seconds, deliberate=True)
+
+    def report(self):
+        """Print wall time split into waiting (by reason) and doing work"""
+        wall = time.perf_counter() - self.started
+        with self.lock:
+            waited = dict(self.waited)
+        total_wait = sum(waited.values())
+        # parallel workers can wait at the same time, so waiting may exceed wall time
+        working = max(0.0, wall - total_wait)
+        breakdown = ", ".join(f"{reason} {secs:.1f}s" for reason, secs in
+                              sorted(waited.items(), key=lambda kv: -kv[1]))
+        print(f"⏱️ Wall time {wall:.1f}s: waiting {total_wait:.1f}s ({breakdown or 'none'}), working {working:.1f}s")
+        return {'wall': wall, 'waiting': total_wait, 'working': working, 'by_reason': waited}
+
+
+class RatePolicy:
+    def __init__(self, rate=0.5, burst=1, jitter=0.0, tracker=None):
+        """At most `rate` requests/second per host (bursts of `burst`), plus up to `jitter` s of random delay"""
+        self.rate = rate
+        self.burst = burst
+        self.jitter = jitter
+        self.tracker = tracker or WaitTracker()
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, url):
+        host = urlparse(url).netloc if url and '://' in url else (url or '')
+        with self.lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.rate, self.burst)
+            return self.buckets[host]
+
+    def pace(self, url=None):
+        """Block until the next request to url's host is allowed"""
+        waited = self.bucket(url).acquire()
+        if self.jitter:
+            extra = random.uniform(0, self.jitter)
+            time.sleep(extra)
+            waited += extra
+        self.tracker.add('pacing', waited, deliberate=True)
+        return waited
+
+    async def pace_async(self, url=None):
+        waited = await self.bucket(url).acquire_async()
+        if self.jitter:
+            extra = random.uniform(0, self.jitter)
+            await asyncio.sleep(extra)
+            waited += extra
+        self.tracker.add('pacing', waited, deliberate=True)
+        return waited
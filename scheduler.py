@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""
+Multi-source scheduler - runs several job boards (sources.Source) at the
+same time in one process. Each source searches its keywords as concurrent
+tasks (up to `source.search_concurrency` at once); every search feeds one
+de-duplicated detail queue - a shared fetch pool with at most
+`source.concurrency` pages in flight per source. Sources share the rate
+limiter, page cache, HTTP connection pool, seen index and output sink, so a
+run over Jobinja and JobVision takes about as long as the slower of the two.
+How many postings are fetched is bounded per keyword and for the whole run.
+
+    SOURCES=jobinja,jobvision python scheduler.py
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from metrics import RunMetrics
+from rate_limit import RatePolicy, WaitTracker
+
+
+class Scheduler:
+    def __init__(self, sources, sink=None, page_cache=None, seen_index=None, fetcher=None,
+                 request_rate=1.0, request_burst=2, jitter=0.5, rate_policy=None, waits=None, metrics=None,
+                 keyword_concurrency=4, max_jobs_per_keyword=30, max_jobs=None):
+        """Share one rate limiter (per-host buckets), cache, HTTP pool, index and sink across `sources`
+
+        keyword_concurrency caps concurrent keyword searches per source.
+        max_jobs_per_keyword / max_jobs (None = unlimited) are detail-fetch budgets
+        per keyword and for the whole run. Timings and counters of every source
+        go to one metrics.RunMetrics, labelled by source and keyword.
+        """
+        self.sources = sources
+        self.sink = sink
+        self.page_cache = page_cache
+        self.keyword_concurrency = keyword_concurrency
+        self.max_jobs_per_keyword = max_jobs_per_keyword
+        self.budget = max_jobs
+        self.metrics = metrics or RunMetrics()
+        self.waits = waits or WaitTracker(metrics=self.metrics)
+        self.rate_policy = rate_policy or RatePolicy(rate=request_rate, burst=request_burst, jitter=jitter,
+                                                     tracker=self.waits)
+        for source in sources:
+            source.share(rate_policy=self.rate_policy, waits=self.waits, page_cache=page_cache,
+                         fetcher=fetcher, sink=sink, seen_index=seen_index, metrics=self.metrics)
+        self.pool = ThreadPoolExecutor(max_workers=max(1, sum(s.concurrency for s in sources)))
+        self.slots = {s.name: threading.Semaphore(s.concurrency) for s in sources}
+        self.lock = threading.Lock()
+        self.claimed = set()   # (source, job_id) handed to the pool this run
+        self.counts = {s.name: {'jobs': 0, 'duplicates': 0, 'known': 0, 'errors': 0} for s in sources}
+
+    def budget_spent(self):
+        return self.budget is not None and self.budget <= 0
+
+    def claim(self, posting):
+        """'new' the first time a posting is seen and the run budget allows it (the caller fetches it)
+
+        'known' for postings from earlier runs (fresh in the seen index, or in
+        the checkpoint of the run being resumed), 'duplicate' for postings
+        already claimed this run, None once the run budget is spent.
+        """
+        scraper = self._source(posting.source).scraper
+        counts = self.counts[posting.source]
+        with self.lock:
+            if self.budget_spent():
+                return None
+            key = (posting.source, posting.job_id)
+            if posting.job_id in scraper.resumed_links:
+                counts['known'] += 1
+                return 'known'
+            if key in self.claimed or posting.job_id in scraper.scraped_links:
+                counts['duplicates'] += 1
+                return 'duplicate'
+            if scraper.seen_index is not None and not scraper.seen_index.needs_fetch(posting.source, posting.job_id):
+                counts['known'] += 1
+                return 'known'
+            self.claimed.add(key)
+            if self.budget is not None:
+                self.budget -= 1
+            return 'new'
+
+    def _source(self, name):
+        return next(s for s in self.sources if s.name == name)
+
+    def _detail(self, source, posting):
+        """Pool task: fetch + extract one posting and hand the record over"""
+        page = None
+        with self.slots[source.name]:
+            try:
+                page = source.fetch_details(posting)
+            except Exception as e:
+                print(f"[{source.name}] fetch failed for {posting.url}: {str(e)[:150]}")
+        try:
+            record = source.extract_record(posting, page)
+        except Exception as e:
+            print(f"[{source.name}] extraction failed for {posting.url}: {str(e)[:150]}")
+            record = None
+        with self.lock:
+            if not record:
+                self.counts[source.name]['errors'] += 1
+                self.metrics.inc('errors')
+                return
+            source.add_record(posting, record)
+            self.counts[source.name]['jobs'] += 1
+        print(f"[{source.name}] ✅ {record['title'][:60]}")
+
+    def _keyword_full(self, futures):
+        if self.budget_spent():
+            return True
+        return self.max_jobs_per_keyword is not None and len(futures) >= self.max_jobs_per_keyword
+
+    def _search(self, source, keyword):
+        with self.metrics.labels(source=source.name, keyword=keyword):
+            return self.run_keyword(source, keyword)
+
+    def run_keyword(self, source, keyword):
+        """Search one keyword and queue the details of its new postings; returns the pool futures"""
+        print(f"[{source.name}] 🔍 {keyword}")
+        futures = []
+        for listing in source.search(keyword):
+            unseen = 0   # postings earlier runs did not cover
+            for posting in source.harvest_links(listing):
+                if self._keyword_full(futures):
+                    break
+                outcome = self.claim(posting)
+                if outcome == 'new':
+                    futures.append(self.pool.submit(self.metrics.bind(self._detail), source, posting))
+                if outcome in ('new', 'duplicate'):
+                    # a posting another keyword took this run says nothing about how old this page is
+                    unseen += 1
+            if not unseen or self._keyword_full(futures):
+                # only postings from earlier runs on this page (later pages are older) or a budget is spent
+                break
+        return futures
+
+    def run_source(self, source, keywords, start=True):
+        with self.metrics.labels(source=source.name):
+            self._run_source(source, keywords, start)
+
+    def _run_source(self, source, keywords, start):
+        if start:
+            try:
+                started = source.start()
+            except Exception as e:
+                print(f"[{source.name}] ❌ start failed: {str(e)[:200]}")
+                started = False
+            if not started:
+                print(f"[{source.name}] could not start - skipped")
+                return
+        pending = []
+        for keyword in keywords:
+            if self.sink is not None and self.sink.keyword_done(source.name, keyword):
+                print(f"[{source.name}] ♻️ '{keyword}' was finished before the restart - skipping")
+                continue
+            pending.append(keyword)
+        if not pending:
+            return
+        # keyword searches run side by side; their postings all land in the one detail pool
+        workers = max(1, min(self.keyword_concurrency, source.search_concurrency, len(pending)))
+        with ThreadPoolExecutor(max_workers=workers) as searches:
+            tasks = [(keyword, searches.submit(self._search, source, keyword)) for keyword in pending]
+            for keyword, task in tasks:
+                try:
+                    wait(task.result())
+                    if self.sink is not None:
+                        self.sink.finish_keyword(source.name, keyword)
+                except Exception as e:
+                    print(f"[{source.name}] ❌ '{keyword}' failed: {str(e)[:200]}")
+
+    def run(self, keywords, start=True):
+        """Run every source over `keywords` concurrently; returns {source: counts}
+
+        start=False skips source.start() (login) for sources that are already running.
+        """
+        start_time = time.perf_counter()
+        threads = [threading.Thread(target=self.run_source, args=(s, keywords, start), name=s.name, daemon=True)
+                   for s in self.sources]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start_time
+        for name, counts in self.counts.items():
+            print(f"{name}: {counts['jobs']} jobs, {counts['duplicates']} duplicates, "
+                  f"{counts['known']} known from earlier runs, {counts['errors']} errors")
+        print(f"All sources done in {elapsed:.1f}s")
+        self.waits.report()
+        self.metrics.report()
+        if self.page_cache is not None:
+            self.page_cache.report()
+        for source in self.sources:
+            source.report()
+        return self.counts
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+        for source in self.sources:
+            source.close()
+
+
+def main():
+    from http_fetch import HttpFetcher
+    from output_sink import RecordSink
+    from page_cache import PageCache
+    from seen_index import SeenIndex
+    from sources import JobinjaSource, JobVisionSource
+
+    names = [n.strip().lower() for n in os.environ.get("SOURCES", "jobinja,jobvision").split(',') if n.strip()]
+    lean = os.environ.get("BROWSER_PROFILE", "lean") != "full"
+    sources = []
+    if 'jobinja' in names:
+        from Jobinja_scraper import JobScraper
+        sources.append(JobinjaSource(JobScraper(fetch_mode=os.environ.get("JOBINJA_FETCH_MODE", "browser"),
+                                                lean_browser=lean,
+                                                base_url=os.environ.get("JOBINJA_BASE_URL", "https://jobinja.ir")),
+                                     # JOBINJA_EMAIL / JOBINJA_PASSWORD -> log in first (public pages otherwise)
+                                     email=os.environ.get("JOBINJA_EMAIL"),
+                                     password=os.environ.get("JOBINJA_PASSWORD")))
+    if 'jobvision' in names:
+        from Jobvision_scraper import JobVisionScraper
+        email = os.environ.get("JOBVISION_EMAIL") or input("Email for JobVision: ").strip()
+        password = os.environ.get("JOBVISION_PASSWORD") or input("Password for JobVision: ").strip()
+        sources.append(JobVisionSource(JobVisionScraper(email, password,
+                                                        fetch_mode=os.environ.get("JOBVISION_FETCH_MODE", "browser"),
+                                                        lean_browser=lean,
+                                                        base_url=os.environ.get("JOBVISION_BASE_URL",
+                                                                                "https://jobvision.ir"),
+                                                        account_url=os.environ.get("JOBVISION_ACCOUNT_URL",
+                                                                                   "https://account.jobvision.ir"))))
+
+    sink = RecordSink.at(os.environ.get("STREAM_OUTPUT", "all_jobs"))
+    scheduler = Scheduler(sources, sink=sink,
+                          page_cache=PageCache(os.environ["PAGE_CACHE"]) if os.environ.get("PAGE_CACHE") else None,
+                          seen_index=SeenIndex(os.environ["SEEN_JOBS_DB"]) if os.environ.get("SEEN_JOBS_DB") else None,
+                          fetcher=HttpFetcher(pool_size=10),
+                          # KEYWORD_CONCURRENCY / MAX_JOBS_PER_KEYWORD / MAX_JOBS -> search fan-out and fetch budgets
+                          keyword_concurrency=int(os.environ.get("KEYWORD_CONCURRENCY", "4")),
+                          max_jobs_per_keyword=int(os.environ.get("MAX_JOBS_PER_KEYWORD", "30")),
+                          max_jobs=int(os.environ["MAX_JOBS"]) if os.environ.get("MAX_JOBS") else None)
+    keywords = ['machine learning', 'هوش مصنوعی', 'deep learning']
+    try:
+        scheduler.run(keywords)
+        if all(sink.all_done(s.name, keywords) for s in sources):
+            sink.finish()
+    finally:
+        # browsers are closed first - a metrics write that fails must not leave them running
+        scheduler.close()
+        sink.close()
+        if os.environ.get("METRICS_OUTPUT"):
+            # METRICS_OUTPUT=run_metrics -> run_metrics.prom (Prometheus text) + run_metrics.json (run report)
+            try:
+                print(f"📈 Metrics written to {', '.join(scheduler.metrics.write(os.environ['METRICS_OUTPUT']))}")
+            except OSError as e:
+                print(f"⚠️ Could not write metrics: {e}")
+
+
+if __name__ == "__main__":
+    main()
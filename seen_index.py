@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Persistent seen-jobs index (SQLite) - lets daily runs skip postings that
+were already scraped recently and only pay for new ones.
+
+    python seen_index.py seed jobs.csv jobvision_jobs_fixed.csv
+"""
+
+import csv
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+
+from job_ids import jobinja_job_id, jobvision_job_id
+
+ID_FUNCS = {'Jobinja': jobinja_job_id, 'JobVision': jobvision_job_id}
+DATE_FORMATS = ('%Y-%m-%d %H:%M:%S', '%m/%d/%Y %H:%M', '%Y-%m-%d')
+
+
+class SeenIndex:
+    def __init__(self, path='seen_jobs.sqlite', refresh_days=30):
+        """Postings fetched less than refresh_days ago are skipped; older ones are fetched again"""
+        self.path = path
+        self.refresh_age = refresh_days * 24 * 3600
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS seen_jobs (
+                source TEXT NOT NULL,
+                job_id TEXT NOT NULL,
+                url TEXT,
+                first_seen REAL NOT NULL,
+                last_fetched REAL NOT NULL,
+                PRIMARY KEY (source, job_id)
+            )""")
+        self.conn.commit()
+
+    def needs_fetch(self, source, job_id):
+        """True for unknown postings and for ones last fetched longer ago than the refresh age"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT last_fetched FROM seen_jobs WHERE source = ? AND job_id = ?",
+                (source, job_id)).fetchone()
+        return row is None or time.time() - row[0] > self.refresh_age
+
+    def mark(self, source, job_id, url=None, fetched_at=None):
+        """Record that a posting's details were just fetched"""
+        fetched_at = fetched_at or time.time()
+        with self.lock:
+            self.conn.execute("""
+                INSERT INTO seen_jobs (source, job_id, url, first_seen, last_fetched)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (source, job_id) DO UPDATE SET
+                    url = COALESCE(excluded.url, url),
+                    last_fetched = MAX(last_fetched, excluded.last_fetched)""",
+                (source, job_id, url, fetched_at, fetched_at))
+            self.conn.commit()
+
+    def count(self, source=None):
+        with self.lock:
+            if source:
+                return self.conn.execute("SELECT COUNT(*) FROM seen_jobs WHERE source = ?", (source,)).fetchone()[0]
+            return self.conn.execute("SELECT COUNT(*) FROM seen_jobs").fetchone()[0]
+
+    def seed_from_csv(self, filename):
+        """Import postings from a previous run's CSV (columns: date_added, link, source)"""
+        added = 0
+        with open(filename, encoding='utf-8-sig', newline='') as f:
+            for row in csv.DictReader(f):
+                source, link = row.get('source'), row.get('link')
+                if source not in ID_FUNCS or not link:
+                    continue
+                self.mark(source, ID_FUNCS[source](link), link, _parse_date(row.get('date_added')))
+                added += 1
+        return added
+
+    def close(self):
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+
+
+def _parse_date(value):
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime((value or '').strip(), fmt).timestamp()
+        except ValueError:
+            continue
+    return None
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] != 'seed':
+        print("usage: python seen_index.py seed <csv> [<csv> ...]")
+        sys.exit(1)
+    index = SeenIndex()
+    for path in sys.argv[2:]:
+        print(f"{path}: {index.seed_from_csv(path)} postings")
+    print(f"Index now holds {index.count()} postings ({index.path})")
+    index.close()
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+Persistent login sessions - saves browser cookies and localStorage after a
+successful login so the next run can skip the login (and captcha) flow.
+"""
+
+import json
+import os
+import time
+import urllib.parse
+
+# fields accepted by CDP Network.setCookies
+COOKIE_FIELDS = ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'sameSite', 'expires')
+
+
+class SessionStore:
+    def __init__(self, path, max_age_days=7):
+        """Session file at `path`; sessions older than max_age_days are ignored"""
+        self.path = path
+        self.max_age = max_age_days * 24 * 3600
+
+    def _all_cookies(self, driver):
+        try:
+            # CDP sees cookies of every domain, not just the current page's
+            return driver.execute_cdp_cmd('Network.getAllCookies', {})['cookies']
+        except Exception:
+            return driver.get_cookies()
+
+    def save(self, driver):
+        """Write the driver's cookies and the current origin's localStorage to disk"""
+        try:
+            parsed = urllib.parse.urlparse(driver.current_url)
+            origin = f"{parsed.scheme}://{parsed.netloc}"
+            local_storage = driver.execute_script(
+                "var d = {}; for (var i = 0; i < localStorage.length; i++) {"
+                " var k = localStorage.key(i); d[k] = localStorage.getItem(k); } return d;") or {}
+            data = {
+                'saved_at': time.time(),
+                'cookies': self._all_cookies(driver),
+                'local_storage': {origin: local_storage},
+            }
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp = self.path + '.tmp'
+            # فایل شامل توکن‌های لاگین است - فقط برای کاربر فعلی قابل خواندن باشد
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+            print(f"Session saved to {self.path} ({len(data['cookies'])} cookies)")
+            return True
+        except Exception as e:
+            print("Could not save session:", str(e)[:150])
+            return False
+
+    def load(self):
+        """Return the saved session dict, or None if missing, unreadable or too old"""
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - data.get('saved_at', 0) > self.max_age:
+            print("Saved session is too old - ignoring it")
+            return None
+        return data
+
+    def restore(self, driver):
+        """Load the saved cookies/localStorage into the driver; False if there was nothing to load"""
+        data = self.load()
+        if not data:
+            return False
+        cookies = [{k: c[k] for k in COOKIE_FIELDS if k in c} for c in data.get('cookies', [])]
+        try:
+            driver.execute_cdp_cmd('Network.setCookies', {'cookies': cookies})
+        except Exception:
+            # بدون CDP فقط کوکی‌های دامنه‌ی صفحه‌ی جاری قابل اضافه شدن هستند
+            for origin in data.get('local_storage', {}):
+                driver.get(origin)
+                host = urllib.parse.urlparse(origin).netloc
+                for cookie in cookies:
+                    if cookie.get('domain', '').lstrip('.') in host:
+                        cookie = {k: v for k, v in cookie.items() if k not in ('sameSite', 'expires')}
+                        try:
+                            driver.add_cookie(cookie)
+                        except Exception:
+                            pass
+        for origin, items in data.get('local_storage', {}).items():
+            if not items:
+                continue
+            try:
+                driver.get(origin)
+                driver.execute_script(
+                    "var d = arguments[0]; for (var k in d) { localStorage.setItem(k, d[k]); }", items)
+            except Exception as e:
+                print("Could not restore localStorage:", str(e)[:150])
+        return True
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+Batched Google Sheets writer - new rows go out in chunked append_rows calls
+(retrying on quota errors, honouring Retry-After), and the Job Link column
+used for de-duplication is cached on disk so later runs only read the rows
+added since.
+
+    python sheets_writer.py --jobs 1200 --chunk 500    # demo against fake_gspread
+"""
+
+import json
+import os
+import time
+
+from gspread.exceptions import APIError
+
+HEADERS = ['Date Added', 'Job Title', 'Company', 'Location', 'Requirements',
+           'Salary', 'Contract Type', 'Working Hours', 'Job Link', 'Source']
+LINK_COLUMN = 'I'   # Job Link
+RETRY_STATUSES = (429, 500, 502, 503)
+# a 5xx on append_rows may come after the rows were written - retrying could add them twice;
+# a 429 is refused before anything is written
+APPEND_RETRY_STATUSES = (429,)
+
+
+def job_to_row(job):
+    return [
+        job['date_added'],
+        job['title'],
+        job['company'],
+        job.get('location', 'N/A'),
+        job['requirements'],
+        job['salary'],
+        job['contract_type'],
+        job['working_hours'],
+        job['link'],
+        job['source']
+    ]
+
+
+class SheetWriter:
+    def __init__(self, sheet, chunk_size=500, max_retries=5, link_cache='.cache/sheet_links.json',
+                 cache_max_age_hours=24, sleep=time.sleep):
+        """Write to a gspread worksheet in chunks of chunk_size rows"""
+        self.sheet = sheet
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.link_cache = link_cache
+        self.cache_max_age = cache_max_age_hours * 3600
+        self.sleep = sleep
+        self.links = None
+        self.rows = 0        # rows in the sheet, header included
+        self.calls = 0       # API calls made (retries included)
+        self.retries = 0
+
+    def _call(self, method, *args, retry_statuses=RETRY_STATUSES, **kwargs):
+        """Run one API call, waiting and retrying on `retry_statuses` (quota exhausted, server errors)"""
+        for attempt in range(self.max_retries + 1):
+            self.calls += 1
+            try:
+                return method(*args, **kwargs)
+            except APIError as e:
+                status = getattr(e.response, 'status_code', None) or e.code
+                if status not in retry_statuses or attempt == self.max_retries:
+                    raise
+                retry_after = getattr(e.response, 'headers', {}).get('Retry-After')
+                delay = float(retry_after) if retry_after else min(2 ** attempt, 64)
+                self.retries += 1
+                print(f"   ⏳ Sheets API {status} - retrying in {delay:.0f}s")
+                self.sleep(delay)
+
+    def _cache_key(self):
+        return f"{getattr(self.sheet.spreadsheet, 'id', '')}/{getattr(self.sheet, 'id', '')}"
+
+    def _load_cache(self):
+        if not self.link_cache:
+            return None
+        try:
+            with open(self.link_cache, encoding='utf-8') as f:
+                data = json.load(f).get(self._cache_key())
+        except (OSError, ValueError):
+            return None
+        if not data or time.time() - data['saved_at'] > self.cache_max_age:
+            return None
+        return data
+
+    def _save_cache(self):
+        if not self.link_cache:
+            return
+        try:
+            with open(self.link_cache, encoding='utf-8') as f:
+                all_data = json.load(f)
+        except (OSError, ValueError):
+            all_data = {}
+        all_data[self._cache_key()] = {'saved_at': time.time(), 'rows': self.rows, 'links': sorted(self.links)}
+        os.makedirs(os.path.dirname(self.link_cache) or '.', exist_ok=True)
+        tmp = self.link_cache + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(all_data, f, ensure_ascii=False)
+        os.replace(tmp, self.link_cache)
+
+    def link_index(self):
+        """Links already in the sheet - from the cache plus only the rows added since it was saved"""
+        if self.links is not None:
+            return self.links
+        cached = self._load_cache()
+        if cached:
+            start = cached['rows'] + 1
+            tail = self._call(self.sheet.get, f"{LINK_COLUMN}{start}:{LINK_COLUMN}")
+            self.links = set(cached['links'])
+            self.links.update(r[0] for r in tail if r)
+            self.rows = cached['rows'] + len(tail)
+        else:
+            column = self._call(self.sheet.col_values, 9)
+            self.links = set(column[1:])
+            self.rows = len(column)
+        return self.links
+
+    def write_header(self):
+        self._call(self.sheet.update, [HEADERS], 'A1')
+        self.rows = max(self.rows, 1)
+
+    def append_jobs(self, jobs):
+        """Append the jobs whose link is not in the sheet yet; returns (added, duplicates)"""
+        links = self.link_index()
+        rows = []
+        for job in jobs:
+            if job['link'] in links:
+                continue
+            links.add(job['link'])
+            rows.append(job_to_row(job))
+        for i in range(0, len(rows), self.chunk_size):
+            chunk = rows[i:i + self.chunk_size]
+            # not idempotent - only retried when the quota refused it
+            self._call(self.sheet.append_rows, chunk, value_input_option='RAW',
+                       retry_statuses=APPEND_RETRY_STATUSES)
+            self.rows += len(chunk)
+            # cache after each chunk - a failed run still knows what it wrote
+            self._save_cache()
+        return len(rows), len(jobs) - len(rows)
+
+
+if __name__ == "__main__":
+    import argparse
+    import tempfile
+    from fake_gspread import FakeClient
+
+    parser = argparse.ArgumentParser(description="Batched Sheets writes against an in-memory fake")
+    parser.add_argument('--jobs', type=int, default=1200)
+    parser.add_argument('--chunk', type=int, default=500)
+    parser.add_argument('--quota', type=int, default=3, help='calls allowed before a 429')
+    args = parser.parse_args()
+
+    client = FakeClient(quota=args.quota)
+    sheet = client.create('AI_ML_Jobs').sheet1
+    jobs = [{'date_added': '2024-01-01', 'title': f'job {i}', 'company': 'c', 'requirements': 'r',
+             'salary': 's', 'contract_type': 't', 'working_hours': 'h',
+             'link': f'https://jobinja.ir/jobs/{i}', 'source': 'Jobinja'} for i in range(args.jobs)]
+    cache = os.path.join(tempfile.mkdtemp(), 'links.json')
+    for run in (1, 2):
+        writer = SheetWriter(sheet, chunk_size=args.chunk, link_cache=cache, sleep=lambda s: None)
+        if run == 1:
+            writer.write_header()
+        added, duplicates = writer.append_jobs(jobs[:args.jobs // 2 * run])
+        print(f"run {run}: added {added}, duplicates {duplicates}, "
+              f"{writer.calls} API calls ({writer.retries} retried) - calls by method: {dict(sheet.calls)}")
+        sheet.calls.clear()
+    print(f"sheet now has {len(sheet.rows)} rows (one per append_row call would have been {args.jobs} calls)")
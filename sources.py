@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+Job sources - every job board goes through the same four steps:
+
+    search(keyword)            -> listing pages
+    harvest_links(listing)     -> Posting(source, job_id, url, card)
+    fetch_details(posting)     -> the posting's page
+    extract_record(posting, page) -> record dict (output_sink.COLUMNS)
+
+JobinjaSource and JobVisionSource adapt the existing scrapers to it, so
+scheduler.Scheduler can run several boards at once with shared resources.
+"""
+
+import threading
+from collections import namedtuple
+
+from html_doc import Document
+from Jobinja_scraper import DETAIL_MARKERS as JOBINJA_DETAIL_MARKERS
+from job_ids import jobinja_job_id
+
+Posting = namedtuple('Posting', 'source job_id url card')
+
+
+class Source:
+    name = None
+    concurrency = 1          # detail fetches this source can have in flight at once
+    search_concurrency = 1   # keyword searches it can run at once
+
+    def __init__(self, scraper):
+        self.scraper = scraper
+
+    def share(self, rate_policy=None, waits=None, page_cache=None, fetcher=None, sink=None, seen_index=None,
+              metrics=None):
+        """Swap the scraper's own rate limiter, cache, HTTP pool, sink, index and metrics for shared ones"""
+        scraper = self.scraper
+        if metrics is not None:
+            scraper.metrics = metrics
+            if scraper.fetcher is not None:
+                scraper.fetcher.metrics = metrics
+        if waits is not None:
+            scraper.waits = waits
+        if rate_policy is not None:
+            scraper.rate_policy = rate_policy
+        if page_cache is not None:
+            scraper.page_cache = page_cache
+        if sink is not None:
+            scraper.sink = sink
+            scraper.resumed_links = scraper.resumed_links | sink.done_ids(self.name)
+            scraper.scraped_links |= scraper.resumed_links
+        if seen_index is not None:
+            scraper.seen_index = seen_index
+        # only sources that already fetch over HTTP take the shared pool - the others stay on Chrome
+        if fetcher is not None and scraper.fetch_mode == 'http':
+            scraper.fetcher = fetcher
+            fetcher.metrics = scraper.metrics
+
+    def start(self):
+        """Log in / warm up; False means the source cannot run"""
+        return True
+
+    def search(self, keyword):
+        raise NotImplementedError
+
+    def harvest_links(self, listing):
+        raise NotImplementedError
+
+    def fetch_details(self, posting):
+        raise NotImplementedError
+
+    def extract_record(self, posting, page):
+        raise NotImplementedError
+
+    def add_record(self, posting, record):
+        """Hand a finished record to the scraper (self.jobs, sink, seen index)"""
+        self.scraper.scraped_links.add(posting.job_id)
+        self.scraper._add_job(posting.job_id, record)
+
+    def report(self):
+        policy = getattr(self.scraper, 'resource_policy', None)
+        if policy is not None:
+            policy.report()
+
+    def close(self):
+        self.scraper.close()
+
+
+class JobinjaSource(Source):
+    name = 'Jobinja'
+
+    def __init__(self, scraper, email=None, password=None):
+        super().__init__(scraper)
+        self.email = email
+        self.password = password
+        # pages come over plain HTTP in http mode; otherwise there is one Chrome
+        self.concurrency = scraper.enricher.per_host_concurrency if scraper.enricher is not None else 1
+        self.search_concurrency = self.concurrency
+
+    def share(self, rate_policy=None, **shared):
+        super().share(rate_policy=rate_policy, **shared)
+        if rate_policy is not None and self.scraper.enricher is not None:
+            self.scraper.enricher.rate_policy = rate_policy
+
+    def start(self):
+        """Log in when credentials are given; without them (or if login fails) the public pages are scraped"""
+        if not self.email or not self.password:
+            print(f"[{self.name}] no credentials - scraping the public pages")
+            return True
+        if not self.scraper.auto_login(self.email, self.password):
+            print(f"[{self.name}] ⚠️ login failed - continuing with the public pages")
+        return True
+
+    def search(self, keyword):
+        for _, cards in self.scraper.listing_pages(keyword):
+            if not cards:
+                return
+            yield cards
+
+    def harvest_links(self, cards):
+        for card in cards:
+            link = self.scraper.card_link(card)
+            if link:
+                yield Posting(self.name, jobinja_job_id(link), link, card)
+
+    def fetch_details(self, posting):
+        return self.scraper.fetch_page(posting.url, markers=JOBINJA_DETAIL_MARKERS)
+
+    def extract_record(self, posting, page):
+        record = self.scraper.parse_jobinja_card(posting.card, fetch_details=False)
+        if record and page:
+            record.update(self.scraper.extract_job_details(Document(page, self.scraper.html_parser, self.scraper.metrics).soup))
+        return record
+
+
+class JobVisionSource(Source):
+    name = 'JobVision'
+
+    def __init__(self, scraper):
+        super().__init__(scraper)
+        # search and detail pages share the logged-in Chrome - one keyword search at a time
+        self.browser_lock = threading.Lock()
+
+    def start(self):
+        # login_to_jobvision raises once every attempt has failed
+        try:
+            return self.scraper.login_to_jobvision()
+        except Exception as e:
+            print(f"[{self.name}] ❌ login failed: {str(e)[:200]}")
+            return False
+
+    def search(self, keyword):
+        with self.browser_lock:
+            hrefs = self.scraper.search_links(self.scraper.search_url(keyword))
+        yield hrefs
+
+    def harvest_links(self, hrefs):
+        for job_id, url in self.scraper.job_links(hrefs):
+            yield Posting(self.name, job_id, url, None)
+
+    def fetch_details(self, posting):
+        with self.browser_lock:
+            return self.scraper.fetch_job_page(posting.url)
+
+    def extract_record(self, posting, page):
+        if not page:
+            return None
+        return self.scraper.parse_job_details(url=posting.url, **page)
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+Condition-driven waits - instead of fixed sleeps, pages are waited on until
+something concrete happens: an element shows up or the number of job links
+stops growing. Time spent is recorded on a rate_limit.WaitTracker.
+"""
+
+import time
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+
+def wait_for(driver, condition, timeout=10, tracker=None, reason='dom'):
+    """WebDriverWait that returns the condition's value, or False on timeout"""
+    start = time.perf_counter()
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=0.2).until(condition)
+    except TimeoutException:
+        return False
+    finally:
+        if tracker is not None:
+            tracker.add(reason, time.perf_counter() - start)
+
+
+def css_count(driver, css):
+    """Number of elements matching css, in one round trip"""
+    return driver.execute_script("return document.querySelectorAll(arguments[0]).length;", css)
+
+
+def scroll_until_stable(driver, css, max_scrolls=4, timeout=3, tracker=None):
+    """Scroll to the bottom until the number of `css` matches stops growing; returns the final count"""
+    count = css_count(driver, css)
+    for _ in range(max_scrolls):
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        previous = count
+        grew = wait_for(driver, lambda d: css_count(d, css) > previous,
+                        timeout=timeout, tracker=tracker, reason='scroll')
+        if not grew:
+            break
+        count = css_count(driver, css)
+    return count